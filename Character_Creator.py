@@ -1,4 +1,4 @@
-from random import choices, randint
+from functools import lru_cache
 
 # CONTENTS
 # - greeting
@@ -37,37 +37,157 @@ def make_selection(category):
             print("Choice doesn't exist! Try again.\n")
             continue
 
-def roll_stat():
+def parse_roll_method(method):
+    # Turn a rolling method into (dice, sides, reroll, drop):
+    #   - "4d6dl1" rolls four six-sided dice and drops the lowest one
+    #   - "3d6" rolls three six-sided dice and keeps them all
+    #   - "4d6r1dl1" rerolls 1s until they come up higher, then drops the lowest
+    #   - In general "NdM", optionally followed by "rX" (reroll X and below)
+    #     and "dlK" (drop the K lowest dice)
+    import re
     
-    # Determine suffix
-    loop_number = len(stats)+1
-    if loop_number == 1:
-        suffix = 'st'
-    elif loop_number == 2:
-        suffix = 'nd'
-    elif loop_number == 3:
-        suffix = 'rd'
-    else:
-        suffix = 'th'
-    
-    print(f'Press ENTER to roll your {len(stats)+1}{suffix} stat.')
-    input()
-    rolls = [randint(1, 6), randint(1, 6), randint(1, 6), randint(1, 6)]
-    print(f'You rolled: {rolls}')
-    rolls.sort()
-    rolls.pop(0)
-    print(f'Removing the lowest roll leaves us with: {rolls}')
-    roll = rolls[0] + rolls[1] + rolls[2]
-    print(f'Adding those gives us a total of: {roll}')
-    stats.append(roll)
-    print(f'So far, your stat rolls are: {stats}\n')
-
-#####
-##### Start main script
-#####
-
-# GREETING
-print(fancy('Hello! Welcome to the character generator for the Seven Shards of Vaelith-Tir.'))
+    match = re.match(r'^(\d+)d(\d+)(?:r(\d+))?(?:dl(\d+))?$', method.strip().lower())
+    if not match:
+        raise ValueError(f"Unknown rolling method '{method}', expected something like 4d6dl1")
+    dice, sides = int(match.group(1)), int(match.group(2))
+    reroll = int(match.group(3) or 0)
+    drop = int(match.group(4) or 0)
+    if dice < 1 or sides < 1:
+        raise ValueError(f"Rolling method '{method}' needs at least one die with at least one side")
+    if reroll >= sides:
+        raise ValueError(f"Rolling method '{method}' rerolls every face")
+    if drop >= dice:
+        raise ValueError(f"Rolling method '{method}' drops every die")
+    # Stats are stored as one byte each, also after the largest race bonus
+    largest_bonus = max(max(bonuses.values()) for bonuses in race_bonuses.values())
+    if (dice - drop) * sides + largest_bonus > 255:
+        raise ValueError(f"Rolling method '{method}' can total more than {255 - largest_bonus}, "
+                         f"and stats plus race bonuses must fit in one byte")
+    return dice, sides, reroll, drop
+
+def roll_stat_arrays(count, method='4d6dl1', rng=None, chunk_size=262144, with_dice=False):
+    # Roll `count` characters' worth of six stats at once, without prompting:
+    #   - Returns a NumPy array of shape (count, 6) with one byte per stat
+    #   - `rng` can be a seed or a numpy.random.Generator, for repeatable rolls
+    #   - Characters are rolled `chunk_size` at a time so millions of them
+    #     never need more than a few megabytes of dice at once
+    #   - With `with_dice`, also returns the dice behind each stat as a
+    #     (count, 6, dice) array, e.g. to show them to a player
+    import numpy as np
+    
+    dice, sides, reroll, drop = parse_roll_method(method)
+    rng = np.random.default_rng(rng)
+    stat_arrays = np.empty((count, 6), dtype=np.uint8)
+    dice_arrays = np.empty((count, 6, dice), dtype=np.uint8) if with_dice else None
+    sum_dtype = np.uint16 if dice * sides <= 65535 else np.uint32
+    
+    for start in range(0, count, chunk_size):
+        end = min(start + chunk_size, count)
+        # Rerolling until a die beats `reroll` is the same as rolling reroll+1 to sides
+        rolls = rng.integers(reroll + 1, sides + 1, size=(end - start, 6, dice), dtype=np.uint8)
+        if with_dice:
+            dice_arrays[start:end] = rolls
+        totals = rolls.sum(axis=2, dtype=sum_dtype)
+        if drop == 1:
+            totals -= rolls.min(axis=2)
+        elif drop:
+            # Partitioning moves the `drop` lowest dice to the front without a full sort
+            totals -= np.partition(rolls, drop - 1, axis=2)[:, :, :drop].sum(axis=2, dtype=sum_dtype)
+        stat_arrays[start:end] = totals
+    
+    if with_dice:
+        return stat_arrays, dice_arrays
+    return stat_arrays
+
+@lru_cache(maxsize=None)
+def count_stat_totals(dice, sides, reroll=0, drop=0):
+    # Count how many of the equally likely rolls give each total, exactly:
+    #   - Returns a tuple where item t is the number of rolls totalling t,
+    #     out of (sides - reroll) ** dice rolls in all
+    #   - Faces are handled from highest to lowest, so the first dice placed
+    #     are the ones that are kept
+    #   - The state is (dice placed so far, total of the kept dice), and
+    #     placing c dice on a face can happen in comb(dice left, c) ways
+    from math import comb
+    
+    keep = dice - drop
+    ways = {(0, 0): 1}
+    for face in range(sides, reroll, -1):
+        next_ways = {}
+        for (placed, total), count in ways.items():
+            left = dice - placed
+            for showing in range(left + 1):
+                kept = min(showing, max(0, keep - placed))
+                state = (placed + showing, total + kept * face)
+                next_ways[state] = next_ways.get(state, 0) + count * comb(left, showing)
+        ways = next_ways
+    
+    counts = [0] * (keep * sides + 1)
+    for (placed, total), count in ways.items():
+        if placed == dice:
+            counts[total] += count
+    return tuple(counts)
+
+def convolve_counts(a, b):
+    # Counts of the sum of two independent totals, given the counts of each
+    import numpy as np
+    
+    # Object arrays keep Python's big integers, so the counts stay exact
+    return tuple(np.convolve(np.array(a, dtype=object), np.array(b, dtype=object)))
+
+@lru_cache(maxsize=None)
+def count_array_totals(dice, sides, reroll=0, drop=0):
+    # Count the rolls giving each sum of a six-stat array, out of
+    # (sides - reroll) ** (6 * dice) rolls in all
+    stat_counts = count_stat_totals(dice, sides, reroll, drop)
+    pair = convolve_counts(stat_counts, stat_counts)
+    return convolve_counts(convolve_counts(pair, pair), pair)
+
+def stat_distribution(method='4d6dl1'):
+    # Exact chance of each stat total for a rolling method, as {total: Fraction}
+    from fractions import Fraction
+    
+    dice, sides, reroll, drop = parse_roll_method(method)
+    outcomes = (sides - reroll) ** dice
+    return {total: Fraction(count, outcomes)
+            for total, count in enumerate(count_stat_totals(dice, sides, reroll, drop)) if count}
+
+def roll_method_summary(method='4d6dl1', percentiles=(5, 25, 50, 75, 95)):
+    # Exact balance figures for a rolling method:
+    #   - mean_stat: average single stat
+    #   - expected_modifier_sum: average total of the six ability modifiers
+    #   - chance_of_18: chance that a single stat is exactly 18
+    #   - chance_of_any_18: chance that at least one of the six stats is 18
+    #   - array_sum_percentiles: {p: smallest six-stat sum reached by at
+    #     least p% of arrays}
+    dice, sides, reroll, drop = parse_roll_method(method)
+    outcomes = (sides - reroll) ** dice
+    stat_counts = count_stat_totals(dice, sides, reroll, drop)
+    
+    mean_stat = sum(total * count for total, count in enumerate(stat_counts)) / outcomes
+    mean_modifier = sum((total - 10) // 2 * count for total, count in enumerate(stat_counts)) / outcomes
+    count_18 = stat_counts[18] if len(stat_counts) > 18 else 0
+    chance_of_any_18 = 1 - ((outcomes - count_18) ** 6) / outcomes ** 6
+    
+    # Walk the cumulative counts of the six-stat sums once for all percentiles
+    array_counts = count_array_totals(dice, sides, reroll, drop)
+    array_outcomes = outcomes ** 6
+    array_sum_percentiles = {}
+    pending = sorted(percentiles)
+    cumulative = 0
+    for total, count in enumerate(array_counts):
+        cumulative += count
+        while pending and cumulative * 100 >= pending[0] * array_outcomes:
+            array_sum_percentiles[pending.pop(0)] = total
+    
+    return {
+        'method': method,
+        'mean_stat': mean_stat,
+        'expected_modifier_sum': 6 * mean_modifier,
+        'chance_of_18': count_18 / outcomes,
+        'chance_of_any_18': chance_of_any_18,
+        'array_sum_percentiles': array_sum_percentiles,
+    }
 
 # Define categories of choices to be made
 categories = [
@@ -81,105 +201,467 @@ categories = [
     }
 ]
 
-# For each category, execute the make_selection function
-# This will add a new key to each item in the categories array
-for i in categories:
-    i.update({'category_selection':make_selection(i)})
-
-
-player_race = categories[0]["category_selection"]
-player_class = categories[1]["category_selection"]
-
-print(fancy(f"You chose a {player_race} {player_class}!"))
-
-
-# Roll ability scores
-print(fancy('ROLL ABILITY SCORES'))
-print("You will roll six times, and then assign each of the six scores to an ability.\n")
-
-stats = []
-while len(stats) < 6:
-    roll_stat()
-
-print(f'Great! Your final stat rolls are: {stats}')
-
-
-
-## Define abilities list
-#abilities = ['strength', 'dexterity', 'constitution', 'wisdom', 'intelligence']
-#
-## Create empty abilities dict
-#abilities_dict = {}
-#
-#for i in abilities:
-#    # The stat number will increase with each iteration through the index, starting from 0 (+1)
-#    loop_number = abilities.index(i)+1
-#    if loop_number == 1:
-#        suffix = 'st'
-#    elif loop_number == 2:
-#        suffix = 'nd'
-#    elif loop_number == 3:
-#        suffix = 'rd'
-#    else:
-#        suffix = 'th'
-#    
-#    input()
-#    roll_stat()
-#
-#
-#
-#print('Now, let\'s assign these scores to your abilities.')
-#
-#choice = input('Which score would you like to assign to STRENGTH? ')
-#
-#if int(choice) in stats:
-#    strength = int(choice)
-#    stats.remove(int(choice))
-#    print('You chose ' + choice + '. Your STRENGTH score is now ' + choice + ' and your remaining options are', stats)
-#
-#choice = input('Which score would you like to assign to DEXTERITY? ')
-#
-#if int(choice) in stats:
-#    dexterity = int(choice)
-#    stats.remove(int(choice))
-#    print('You chose ' + choice + '. Your DEXTERITY score is now ' + choice + ' and your remaining options are', stats)
-#
-#choice = input('Which score would you like to assign to CONSTITUTION? ')
-#
-#if int(choice) in stats:
-#    constitution = int(choice)
-#    stats.remove(int(choice))
-#    print('You chose ' + choice + '. Your CONSTITUTION score is now ' + choice + ' and your remaining options are', stats)
-#
-#choice = input('Which score would you like to assign to WISDOM? ')
-#
-#if int(choice) in stats:
-#    wisdom = int(choice)
-#    stats.remove(int(choice))
-#    print('You chose ' + choice + '. Your WISDOM score is now ' + choice + ' and your remaining options are', stats)
-#
-#choice = input('Which score would you like to assign to INTELLIGENCE? ')
-#
-#if int(choice) in stats:
-#    intelligence = int(choice)
-#    stats.remove(int(choice))
-#    charisma = stats[0]
-#    print('You chose ' + choice + '. Your INTELLIGENCE score is now ' + choice + ', and your CHARISMA score is ' + str(stats[0]) +'.')
-#
-#input()
-#
-#print('Alright! Here\'s how you assigned your scores:')
-#print('STRENGTH:', strength)
-#print('DEXTERITY:', dexterity)
-#print('CONSTITUTION:', constitution)
-#print('WISDOM:', wisdom)
-#print('INTELLIGENCE', intelligence)
-#print('CHARISMA', charisma)
-#
-#input()
-#
-#
-#
-#
-#
-#
\ No newline at end of file
+# Define abilities, in character sheet order
+abilities = ['STR', 'DEX', 'CON', 'INT', 'WIS', 'CHA']
+ability_names = ['STRENGTH', 'DEXTERITY', 'CONSTITUTION', 'INTELLIGENCE', 'WISDOM', 'CHARISMA']
+
+# For each class, the abilities from most to least important
+# The highest roll goes to the first ability, the next highest to the second, and so on
+class_priorities = {
+    'Barbarian': ['STR', 'CON', 'DEX', 'WIS', 'CHA', 'INT'],
+    'Bard': ['CHA', 'DEX', 'CON', 'WIS', 'INT', 'STR'],
+    'Cleric': ['WIS', 'CON', 'STR', 'DEX', 'CHA', 'INT'],
+    'Druid': ['WIS', 'CON', 'DEX', 'INT', 'CHA', 'STR'],
+    'Fighter': ['STR', 'CON', 'DEX', 'WIS', 'CHA', 'INT'],
+    'Monk': ['DEX', 'WIS', 'CON', 'STR', 'INT', 'CHA'],
+    'Paladin': ['STR', 'CHA', 'CON', 'WIS', 'DEX', 'INT'],
+    'Ranger': ['DEX', 'WIS', 'CON', 'STR', 'INT', 'CHA'],
+    'Rogue': ['DEX', 'CON', 'INT', 'WIS', 'CHA', 'STR'],
+    'Sorcerer': ['CHA', 'CON', 'DEX', 'WIS', 'INT', 'STR'],
+    'Warlock': ['CHA', 'CON', 'DEX', 'WIS', 'INT', 'STR'],
+    'Wizard': ['INT', 'CON', 'DEX', 'WIS', 'CHA', 'STR'],
+}
+
+# Ability score bonuses for each race
+race_bonuses = {
+    'Halfling': {'DEX': 2},
+    'Dwarf': {'CON': 2},
+    'Triton': {'STR': 1, 'CON': 1, 'CHA': 1},
+    'Tiefling': {'CHA': 2, 'INT': 1},
+    'Elf': {'DEX': 2},
+    'Goliath': {'STR': 2, 'CON': 1},
+    'Human': {'STR': 1, 'DEX': 1, 'CON': 1, 'INT': 1, 'WIS': 1, 'CHA': 1},
+}
+
+def suggest_abilities(stats, player_class, player_race=None):
+    # Assign six rolled stats to abilities for one character, with assign_abilities:
+    #   - The highest roll goes to the class's most important ability, and so on
+    #   - If a race is given, its bonuses are added on top
+    #   - Returns a dict like {'STR': 15, 'DEX': 14, ...}
+    import numpy as np
+    
+    classes = np.array([choice_index(categories[1], player_class)])
+    races = None if player_race is None else np.array([choice_index(categories[0], player_race)])
+    scores = assign_abilities(np.array([stats]), classes, races)[0]
+    return dict(zip(abilities, scores.tolist()))
+
+def assign_abilities(stats, classes, races=None):
+    # The same as suggest_abilities for a whole batch at once:
+    #   - `stats` is a (count, 6) array of rolls, `classes` and `races` are
+    #     indices into the `categories` choices
+    #   - Returns a (count, 6) array of scores in `abilities` order, one byte
+    #     per score; scores above 255 raise ValueError instead of wrapping
+    #   - Each row is sorted once, and a per-class table of ranks picks the
+    #     roll for every ability, so there is no loop over characters
+    import numpy as np
+    
+    # ranks[class][ability] = position of that ability in the class's priorities
+    ranks = np.array([[class_priorities[name].index(ability) for ability in abilities]
+                      for name in categories[1]['category_choices']], dtype=np.intp)
+    ranked = np.sort(stats, axis=1)[:, ::-1]
+    scores = np.take_along_axis(ranked, ranks[classes], axis=1)
+    
+    if races is not None:
+        bonuses = np.array([[race_bonuses[name].get(ability, 0) for ability in abilities]
+                            for name in categories[0]['category_choices']], dtype=np.uint16)
+        scores = scores + bonuses[races]
+    if scores.max(initial=0) > 255:
+        raise ValueError("Ability scores above 255 can't be stored in one byte")
+    return scores.astype(np.uint8)
+
+def assign_chunks(chunks, with_race_bonuses=False):
+    # Apply assign_abilities to each chunk from iter_character_chunks
+    for races, classes, stats in chunks:
+        yield races, classes, assign_abilities(stats, classes, races if with_race_bonuses else None)
+
+def choice_index(category, name):
+    # Find a race or class by name, ignoring case
+    lowered = [i.lower() for i in category['category_choices']]
+    if name.strip().lower() not in lowered:
+        raise ValueError(f"Unknown {category['category_type']} '{name}', choose from: "
+                         f"{', '.join(category['category_choices'])}")
+    return lowered.index(name.strip().lower())
+
+def choose_indices(count, category, choice, rng):
+    # Pick `count` races or classes as indices into the category's choices:
+    #   - None picks uniformly
+    #   - A name like "Elf" picks that one every time
+    #   - A dict like {"Elf": 3, "Human": 1} picks by weight, leaving out the rest
+    import numpy as np
+    
+    if choice is None:
+        return rng.integers(0, len(category['category_choices']), size=count, dtype=np.uint8)
+    if isinstance(choice, str):
+        return np.full(count, choice_index(category, choice), dtype=np.uint8)
+    
+    weights = np.zeros(len(category['category_choices']))
+    for name, weight in choice.items():
+        weights[choice_index(category, name)] = weight
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError(f"{category['category_type'].capitalize()} weights must be positive")
+    return rng.choice(len(weights), size=count, p=weights / weights.sum()).astype(np.uint8)
+
+# Characters per chunk; every chunk gets its own random stream, so this
+# must stay fixed for a seed to give the same characters
+CHUNK_SIZE = 65536
+
+def generate_chunk(size, race, char_class, method, seed_sequence):
+    # Generate one chunk of characters from its own random stream
+    import numpy as np
+    
+    rng = np.random.default_rng(seed_sequence)
+    races = choose_indices(size, categories[0], race, rng)
+    classes = choose_indices(size, categories[1], char_class, rng)
+    return races, classes, roll_stat_arrays(size, method, rng, size)
+
+def iter_character_chunks(count, race=None, char_class=None, method='4d6dl1', seed=None, workers=1):
+    # Generate `count` characters without prompting, CHUNK_SIZE at a time:
+    #   - Yields (races, classes, stats) arrays: race and class indices into
+    #     the `categories` choices, and a (chunk, 6) array of stat rolls
+    #   - `race` and `char_class` are chosen as described in choose_indices
+    #   - `seed` (an int or a numpy.random.SeedSequence) is split into one
+    #     independent stream per chunk, so a seed and count always give the
+    #     same characters, whatever the number of `workers`
+    #   - With more than one worker, chunks are generated in a process pool
+    #     and still yielded in order
+    import numpy as np
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    
+    parse_roll_method(method)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    sizes = [min(CHUNK_SIZE, count - start) for start in range(0, count, CHUNK_SIZE)]
+    chunk_args = zip(sizes, seed.spawn(len(sizes)))
+    
+    if workers <= 1 or len(sizes) <= 1:
+        for size, seed_sequence in chunk_args:
+            yield generate_chunk(size, race, char_class, method, seed_sequence)
+        return
+    
+    # Keep a few chunks per worker in flight, so a slow writer doesn't
+    # leave every chunk of a huge batch waiting in memory
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for size, seed_sequence in chunk_args:
+            pending.append(executor.submit(generate_chunk, size, race, char_class, method, seed_sequence))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def generate_characters(count, race=None, char_class=None, method='4d6dl1', seed=None, workers=1):
+    # Generate `count` characters at once as (races, classes, stats) arrays
+    import numpy as np
+    
+    chunks = list(iter_character_chunks(count, race, char_class, method, seed, workers))
+    if not chunks:
+        return np.empty(0, np.uint8), np.empty(0, np.uint8), np.empty((0, 6), np.uint8)
+    return tuple(np.concatenate(column) for column in zip(*chunks))
+
+def write_ndjson(stream, chunks, assigned=False):
+    # Write characters from iter_character_chunks as one JSON object per line
+    #   - Every race/class pair gets its line pre-escaped up front, so each
+    #     character only costs one string format
+    #   - With `assigned`, the stats are scores from assign_chunks and are
+    #     written as an "abilities" object instead of a "stats" list
+    #   - Returns the number of characters written
+    import json
+    
+    if assigned:
+        stats_format = '"abilities": {' + ', '.join(f'"{ability}": %d' for ability in abilities) + '}}\n'
+    else:
+        stats_format = '"stats": [%d, %d, %d, %d, %d, %d]}\n'
+    class_count = len(categories[1]['category_choices'])
+    templates = [
+        ('{"race": %s, "class": %s, ' % (json.dumps(race), json.dumps(char_class))).replace('%', '%%')
+        + stats_format
+        for race in categories[0]['category_choices']
+        for char_class in categories[1]['category_choices']
+    ]
+    
+    written = 0
+    for races, classes, stats in chunks:
+        pairs = (races.astype(int) * class_count + classes).tolist()
+        stream.write(''.join([templates[pair] % row for pair, row in zip(pairs, map(tuple, stats.tolist()))]))
+        written += len(pairs)
+    return written
+
+def write_store(directory, chunks, count, assigned=False):
+    # Save characters from iter_character_chunks as a columnar store:
+    #   - A directory with one .npy file per column, one byte per character:
+    #     race.npy and class.npy hold indices into the `categories` choices,
+    #     then one file per ability (or roll1.npy to roll6.npy for unassigned
+    #     rolls)
+    #   - meta.json records the count, the columns and the race and class
+    #     names the indices refer to
+    #   - Columns are filled through memory maps, so a batch never has to
+    #     fit in memory
+    #   - Returns the number of characters written
+    import json
+    import numpy as np
+    from pathlib import Path
+    
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'meta.json').unlink(missing_ok=True)
+    stat_columns = abilities if assigned else [f'roll{i}' for i in range(1, 7)]
+    columns = {
+        name: np.lib.format.open_memmap(directory / f'{name}.npy', mode='w+', dtype=np.uint8, shape=(count,))
+        for name in ['race', 'class'] + stat_columns
+    }
+    
+    written = 0
+    for races, classes, stats in chunks:
+        if stats.dtype != np.uint8:
+            raise ValueError(f"Stats must be one byte each to store them, not {stats.dtype}")
+        end = written + len(races)
+        columns['race'][written:end] = races
+        columns['class'][written:end] = classes
+        for i, name in enumerate(stat_columns):
+            columns[name][written:end] = stats[:, i]
+        written = end
+    
+    for column in columns.values():
+        column.flush()
+    
+    # Written last, so a store that was interrupted can't be opened
+    meta = {
+        'count': written,
+        'stat_columns': stat_columns,
+        'races': categories[0]['category_choices'],
+        'classes': categories[1]['category_choices'],
+    }
+    with open(directory / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return written
+
+class CharacterStore:
+    # Read-only access to a store saved by write_store:
+    #   - Columns are memory-mapped, so opening a store of tens of millions
+    #     of characters is instant and queries only touch the columns they use
+    #   - store.filter(race='Elf', char_class=['Wizard', 'Sorcerer'], min_stats={'INT': 16})
+    #     returns the indices of matching characters
+    #   - store.histogram('STR') counts characters per value, and
+    #     store.records(indices) turns characters back into dicts
+    
+    def __init__(self, directory):
+        import json
+        import numpy as np
+        from pathlib import Path
+        
+        self.directory = Path(directory)
+        with open(self.directory / 'meta.json', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.races = self.meta['races']
+        self.classes = self.meta['classes']
+        self.stat_columns = self.meta['stat_columns']
+        self.columns = {
+            name: np.load(self.directory / f'{name}.npy', mmap_mode='r')
+            for name in ['race', 'class'] + self.stat_columns
+        }
+    
+    def __len__(self):
+        return self.meta['count']
+    
+    def filter(self, race=None, char_class=None, min_stats=None, max_stats=None):
+        # Indices of characters matching every condition given:
+        #   - `race` and `char_class` are a name or a list of names
+        #   - `min_stats` and `max_stats` map columns to inclusive bounds,
+        #     like {'STR': 15}
+        import numpy as np
+        
+        mask = np.ones(len(self), dtype=bool)
+        for column, names, options in (('race', race, self.races), ('class', char_class, self.classes)):
+            if names is None:
+                continue
+            if isinstance(names, str):
+                names = [names]
+            wanted = np.zeros(256, dtype=bool)
+            for name in names:
+                wanted[choice_index({'category_type': column, 'category_choices': options}, name)] = True
+            # Look the byte codes up in a table rather than comparing once per name
+            mask &= wanted[self.columns[column]]
+        for column, bound in (min_stats or {}).items():
+            mask &= self.column(column) >= bound
+        for column, bound in (max_stats or {}).items():
+            mask &= self.column(column) <= bound
+        return np.flatnonzero(mask)
+    
+    def histogram(self, column, indices=None):
+        # Count characters per value of a column, optionally only at `indices`:
+        #   - For 'race' and 'class', returns {name: count}
+        #   - For stat columns, returns {value: count} for the values present
+        import numpy as np
+        
+        values = self.column(column)
+        if indices is not None:
+            values = values[indices]
+        counts = np.bincount(values, minlength=256)
+        if column in ('race', 'class'):
+            names = self.races if column == 'race' else self.classes
+            return {name: int(counts[i]) for i, name in enumerate(names)}
+        return {value: int(count) for value, count in enumerate(counts) if count}
+    
+    def records(self, indices):
+        # Characters at `indices` as dicts, like the NDJSON output
+        stats = {name: self.columns[name][indices].tolist() for name in self.stat_columns}
+        records = []
+        for i, (race, char_class) in enumerate(zip(self.columns['race'][indices].tolist(),
+                                                   self.columns['class'][indices].tolist())):
+            record = {'race': self.races[race], 'class': self.classes[char_class]}
+            if self.stat_columns == abilities:
+                record['abilities'] = {name: stats[name][i] for name in abilities}
+            else:
+                record['stats'] = [stats[name][i] for name in self.stat_columns]
+            records.append(record)
+        return records
+    
+    def column(self, name):
+        if name not in self.columns:
+            raise ValueError(f"Unknown column '{name}', choose from: {', '.join(self.columns)}")
+        return self.columns[name]
+    
+def parse_choice(text):
+    # Read a --race or --class value: "uniform", a name, or weights like "Elf=3,Human=1"
+    if text is None or text.lower() == 'uniform':
+        return None
+    if '=' not in text:
+        return text
+    weights = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        weights[name] = float(weight)
+    return weights
+
+def interactive():
+    
+    # GREETING
+    print(fancy('Hello! Welcome to the character generator for the Seven Shards of Vaelith-Tir.'))
+    
+    # For each category, execute the make_selection function
+    # This will add a new key to each item in the categories array
+    for i in categories:
+        i.update({'category_selection':make_selection(i)})
+
+
+    player_race = categories[0]["category_selection"]
+    player_class = categories[1]["category_selection"]
+
+    print(fancy(f"You chose a {player_race} {player_class}!"))
+
+
+    # Roll ability scores, the same way as a batch of characters
+    print(fancy('ROLL ABILITY SCORES'))
+    print("You will roll six times, and then assign each of the six scores to an ability.")
+    print("Each score is four six-sided dice with the lowest one dropped.\n")
+
+    stat_arrays, dice_arrays = roll_stat_arrays(1, with_dice=True)
+    stats = stat_arrays[0].tolist()
+    for i, roll in enumerate(stats):
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(i + 1, 'th')
+        print(f'Press ENTER to roll your {i + 1}{suffix} stat.')
+        input()
+        rolls = dice_arrays[0, i].tolist()
+        print(f'You rolled: {rolls}')
+        print(f'Removing the lowest roll leaves us with: {sorted(rolls)[1:]}')
+        print(f'Adding those gives us a total of: {roll}')
+        print(f'So far, your stat rolls are: {stats[:i + 1]}\n')
+
+    print(f'Great! Your final stat rolls are: {stats}')
+
+    # Assign ability scores
+    print(fancy('ASSIGN ABILITY SCORES'))
+    suggestion = suggest_abilities(stats, player_class)
+    print(f'For a {player_class}, the best assignment is:')
+    for ability, name in zip(abilities, ability_names):
+        print(f'  {name}: {suggestion[ability]}')
+    
+    if input('\nUse this assignment? [Y/n] ').strip().lower() in ('', 'y', 'yes'):
+        scores = suggestion
+    else:
+        scores = assign_interactively(stats)
+    
+    # Apply race bonuses
+    scores = {ability: score + race_bonuses[player_race].get(ability, 0) for ability, score in scores.items()}
+    print(fancy(f"YOUR {player_race.upper()} {player_class.upper()}"))
+    for ability, name in zip(abilities, ability_names):
+        bonus = race_bonuses[player_race].get(ability, 0)
+        print(f'{name}: {scores[ability]}' + (f' (includes +{bonus} {player_race} bonus)' if bonus else ''))
+
+def assign_interactively(stats):
+    # Let the player assign each score to an ability by hand
+    print("Let's assign these scores to your abilities.")
+    remaining = list(stats)
+    scores = {}
+    for ability, name in zip(abilities[:-1], ability_names[:-1]):
+        while True:
+            choice = input(f'Which score would you like to assign to {name}? ')
+            if choice.strip().isdigit() and int(choice) in remaining:
+                break
+            print(f"That's not one of your remaining scores: {remaining}")
+        scores[ability] = int(choice)
+        remaining.remove(int(choice))
+        print(f'Your {name} score is now {choice} and your remaining options are {remaining}')
+    
+    # The last score goes to the last ability
+    scores[abilities[-1]] = remaining[0]
+    print(f'Your {ability_names[-1]} score is {remaining[0]}.')
+    return scores
+
+def main(argv=None):
+    import argparse
+    import sys
+    
+    # With no arguments, walk through making one character interactively
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        interactive()
+        return 0
+    
+    parser = argparse.ArgumentParser(
+        description="Generate characters for the Seven Shards of Vaelith-Tir. "
+                    "Run without arguments to make one interactively."
+    )
+    parser.add_argument("--count", type=int, required=True, help="Number of characters to generate")
+    parser.add_argument("--race", help='"uniform" (default), a race name, or weights like "Elf=3,Human=1"')
+    parser.add_argument("--class", dest="char_class", metavar="CLASS", help='"uniform" (default), a class name, or weights like "Wizard=2,Rogue=1"')
+    parser.add_argument("--method", default='4d6dl1', help="Stat rolling method, e.g. 4d6dl1 (default), 3d6 or 4d6r1dl1")
+    parser.add_argument("--output", default='-', help="NDJSON file to write (default: stdout)")
+    parser.add_argument("--store", help="Save a columnar store in this directory instead of writing NDJSON")
+    parser.add_argument("--seed", type=int, help="Seed for a reproducible batch (default: a random one, which is reported)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes generating characters (default: 1)")
+    parser.add_argument("--assign", action="store_true", help="Assign the rolls to abilities by class priority")
+    parser.add_argument("--race-bonuses", action="store_true", help="With --assign, add each race's ability bonuses")
+    args = parser.parse_args(argv)
+    if args.race_bonuses and not args.assign:
+        parser.error("--race-bonuses needs --assign")
+    
+    import numpy as np
+    
+    # Report the seed of an unseeded batch so it can be generated again
+    seed = np.random.SeedSequence(args.seed)
+    if args.seed is None:
+        print(f"Seed: {seed.entropy}", file=sys.stderr)
+    
+    try:
+        chunks = iter_character_chunks(args.count, parse_choice(args.race), parse_choice(args.char_class),
+                                       args.method, seed, args.workers)
+        if args.assign:
+            chunks = assign_chunks(chunks, args.race_bonuses)
+        if args.store:
+            written = write_store(args.store, chunks, args.count, args.assign)
+        elif args.output == '-':
+            written = write_ndjson(sys.stdout, chunks, args.assign)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                written = write_ndjson(f, chunks, args.assign)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    print(f"Generated {written} characters", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -7,8 +7,503 @@ that don't already have them.
 """
 
 import argparse
+import time
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+
+class IOThrottle:
+    """Rate limiter for note reads and writes.
+    
+    Enforces optional operations-per-second and megabytes-per-second limits
+    and adapts the batch size (files processed between pauses) to the
+    latency of recent I/O, so a run backs off when the disk is busy.
+    """
+    
+    def __init__(self, max_iops: float = 0, max_mbps: float = 0,
+                 batch_size: int = 64, batch_pause: float = 0.0):
+        self.max_iops = max_iops
+        self.max_bytes_per_second = max_mbps * 1024 * 1024
+        self.max_batch_size = max(1, batch_size)
+        self.batch_size = self.max_batch_size
+        self.batch_pause = batch_pause
+        self.latency_spikes = 0
+        self._next_op_time = time.monotonic()
+        self._next_byte_time = time.monotonic()
+        self._average_latency = None
+        self._spiked_this_batch = False
+    
+    def acquire(self, num_bytes: int = 0) -> None:
+        """Block until one more I/O operation of num_bytes is allowed."""
+        now = time.monotonic()
+        wait_until = now
+        
+        if self.max_iops > 0:
+            wait_until = max(wait_until, self._next_op_time)
+            self._next_op_time = max(now, self._next_op_time) + 1.0 / self.max_iops
+        
+        if self.max_bytes_per_second > 0 and num_bytes:
+            wait_until = max(wait_until, self._next_byte_time)
+            self._next_byte_time = (
+                max(now, self._next_byte_time) + num_bytes / self.max_bytes_per_second
+            )
+        
+        if wait_until > now:
+            time.sleep(wait_until - now)
+    
+    def record_latency(self, seconds: float) -> None:
+        """Record the duration of one I/O operation and shrink the batch on spikes."""
+        if self._average_latency is None:
+            self._average_latency = seconds
+            return
+        
+        # A spike is an operation much slower than the recent average; ignore
+        # sub-millisecond noise from the page cache
+        if seconds > 0.005 and seconds > 4 * self._average_latency:
+            self.latency_spikes += 1
+            self._spiked_this_batch = True
+            self.batch_size = max(1, self.batch_size // 2)
+        
+        self._average_latency = 0.9 * self._average_latency + 0.1 * seconds
+    
+    def end_batch(self) -> None:
+        """Pause between batches and grow the batch again after a quiet one."""
+        if self._spiked_this_batch:
+            # Give other disk users room to drain their queue
+            time.sleep(max(self.batch_pause, 0.25))
+        else:
+            self.batch_size = min(self.max_batch_size, self.batch_size + max(1, self.batch_size // 4))
+            if self.batch_pause:
+                time.sleep(self.batch_pause)
+        self._spiked_this_batch = False
+
+
+def enter_background_mode() -> List[str]:
+    """Lower the CPU and I/O scheduling priority of the current process.
+    
+    Returns:
+        Descriptions of the priorities that were applied
+    """
+    import os
+    import shutil
+    import subprocess
+    import sys
+    
+    applied = []
+    
+    # Lowest CPU priority
+    if hasattr(os, 'nice'):
+        try:
+            os.nice(19 - os.nice(0))
+            applied.append("cpu priority: nice 19")
+        except OSError:
+            pass
+    
+    # Idle I/O priority
+    if sys.platform.startswith('linux') and shutil.which('ionice'):
+        result = subprocess.run(
+            ['ionice', '-c', '3', '-p', str(os.getpid())],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        if result.returncode == 0:
+            applied.append("i/o priority: idle")
+    elif sys.platform == 'darwin' and shutil.which('taskpolicy'):
+        result = subprocess.run(
+            ['taskpolicy', '-b', '-p', str(os.getpid())],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        if result.returncode == 0:
+            applied.append("i/o priority: background")
+    
+    return applied
+
+
+class UnsupportedEncoding(ValueError):
+    """Raised for notes that can't be decoded and written back safely."""
+
+
+def reject_wide_or_binary(data: bytes) -> None:
+    """Raise UnsupportedEncoding if the bytes start with a UTF-16/32 byte order mark or hold NUL bytes."""
+    if data.startswith((b'\xff\xfe', b'\xfe\xff', b'\x00\x00\xfe\xff')):
+        raise UnsupportedEncoding("UTF-16 or UTF-32 byte order mark")
+    if b'\x00' in data:
+        raise UnsupportedEncoding("contains NUL bytes (binary, UTF-16 or UTF-32)")
+
+
+def normalize_line_endings(data: bytes) -> bytes:
+    """Convert CRLF and lone CR line endings to LF, like text mode."""
+    return data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+
+def decode_note(data: bytes) -> Tuple[str, str]:
+    """Decode the raw bytes of a note.
+    
+    Notes that are not valid UTF-8 are decoded as Windows-1252 when that
+    gives plain text, and can then be written back in it. UTF-16 and UTF-32
+    notes, binary files and anything else are rejected rather than guessed
+    at. Line endings are normalized like text mode.
+    
+    Args:
+        data: Raw file contents
+    
+    Returns:
+        (content, encoding): Tuple of decoded text and the encoding used
+    
+    Raises:
+        UnsupportedEncoding: If the note isn't UTF-8 or Windows-1252 text
+    """
+    import re
+    
+    reject_wide_or_binary(data)
+    # CR and LF bytes are never part of a multibyte character in either encoding
+    data = normalize_line_endings(data)
+    try:
+        content, encoding = data.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        # Windows-1252 leaves only five bytes undefined, so also require
+        # text without control characters before trusting it
+        try:
+            content, encoding = data.decode('cp1252'), 'cp1252'
+        except UnicodeDecodeError:
+            content = None
+        if content is None or re.search('[\x01-\x08\x0e-\x1f\x7f]', content):
+            raise UnsupportedEncoding("neither UTF-8 nor Windows-1252 text") from None
+    
+    return content, encoding
+
+
+def read_note(file_path: Path, throttle: Optional[IOThrottle] = None,
+              acquired: bool = False) -> Tuple[str, str]:
+    """Read a markdown file, respecting the I/O throttle if one is given.
+    
+    Args:
+        file_path: Path to the markdown file
+        throttle: Optional I/O rate limiter
+        acquired: The read was already charged to the throttle (by the
+            prefilter), so it only records the latency
+    
+    Returns:
+        (content, encoding): Tuple of decoded text and the encoding to write it back with
+    """
+    if throttle is None:
+        with open(file_path, 'rb') as f:
+            return decode_note(f.read())
+    
+    if not acquired:
+        throttle.acquire(file_path.stat().st_size)
+    start = time.monotonic()
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    throttle.record_latency(time.monotonic() - start)
+    return decode_note(data)
+
+
+def write_note(file_path: Path, content: str, throttle: Optional[IOThrottle] = None,
+               encoding: str = 'utf-8') -> None:
+    """Write a markdown file, respecting the I/O throttle if one is given.
+    
+    The content is encoded before the file is opened, so a note whose new
+    content can't be represented in its encoding is left as it was.
+    """
+    import os
+    
+    # Same line endings as writing in text mode
+    data = content.replace('\n', os.linesep).encode(encoding)
+    if throttle is None:
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        return
+    
+    throttle.acquire(len(data))
+    start = time.monotonic()
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    throttle.record_latency(time.monotonic() - start)
+
+
+# Byte patterns for the prefilter in note_needs_update
+PREFILTER_PROPERTY_PATTERN = None
+PREFILTER_LEGACY_PATTERN = None
+PREFILTER_HASHTAG_PATTERN = None
+
+
+def note_needs_update(file_path: Path, throttle: Optional[IOThrottle] = None) -> bool:
+    """Cheaply check at the byte level whether a note may need frontmatter changes.
+    
+    The file is memory-mapped and never decoded as a whole. Its read is
+    charged to the throttle here, so the full read that may follow isn't
+    charged again. A note is only
+    reported as compliant when it starts with a complete frontmatter block
+    holding every property in the canonical order, has no legacy
+    project/area/resource keys, no URL-generated tags and no '#' directly
+    followed by a word character anywhere. Anything else returns True and
+    goes through the full processing path.
+    
+    Args:
+        file_path: Path to the markdown file
+        throttle: Optional I/O rate limiter
+    
+    Returns:
+        False if the note certainly needs no content changes, True otherwise
+    """
+    import mmap
+    import re
+    
+    global PREFILTER_PROPERTY_PATTERN, PREFILTER_LEGACY_PATTERN, PREFILTER_HASHTAG_PATTERN
+    if PREFILTER_PROPERTY_PATTERN is None:
+        PREFILTER_PROPERTY_PATTERN = re.compile(
+            rb'^(created|para|category|subcategory|priority|tags|archived):', re.MULTILINE
+        )
+        PREFILTER_LEGACY_PATTERN = re.compile(rb'^(?:project|resource|area):', re.MULTILINE)
+        # Word characters for ASCII plus any byte of a multi-byte UTF-8 sequence
+        PREFILTER_HASHTAG_PATTERN = re.compile(rb'#[0-9A-Za-z_\x80-\xff]')
+    
+    size = file_path.stat().st_size
+    if throttle is not None:
+        throttle.acquire(size)
+    if size < 8:
+        return True
+    
+    start = time.monotonic()
+    
+    try:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:4] != b'---\n':
+                return True
+            
+            frontmatter_end = data.find(b'\n---\n', 4)
+            if frontmatter_end == -1:
+                return True
+            
+            if PREFILTER_HASHTAG_PATTERN.search(data):
+                return True
+            
+            frontmatter = data[4:frontmatter_end]
+    finally:
+        if throttle is not None:
+            throttle.record_latency(time.monotonic() - start)
+    
+    if PREFILTER_LEGACY_PATTERN.search(frontmatter):
+        return True
+    
+    # Every property present, with its first occurrence in canonical order
+    seen = []
+    for key in PREFILTER_PROPERTY_PATTERN.findall(frontmatter):
+        if key not in seen:
+            seen.append(key)
+    if seen != [b'created', b'para', b'category', b'subcategory', b'priority', b'tags', b'archived']:
+        return True
+    
+    # Only the small frontmatter is decoded, to check its tags against the URL rules
+    try:
+        existing_tags = extract_existing_tags_from_frontmatter(frontmatter.decode('utf-8'))
+    except UnicodeDecodeError:
+        return True
+    
+    return any(url_tag_rules.match(tag) for tag in existing_tags)
+
+
+# CPU seconds one file may take before it is quarantined
+DEFAULT_FILE_TIME_BUDGET = 5.0
+
+
+class FileTimeBudgetExceeded(Exception):
+    """Raised when a single file takes more CPU time than its budget."""
+
+
+class cpu_time_budget:
+    """Context manager raising FileTimeBudgetExceeded after `seconds` of CPU time.
+    
+    Uses a profiling interval timer, which the regex engine also checks while
+    matching. It is a no-op when seconds is 0, on platforms without
+    setitimer (Windows), and outside the main thread.
+    """
+    
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._previous_handler = None
+    
+    def _expired(self, signum, frame):
+        raise FileTimeBudgetExceeded(f"exceeded {self.seconds:g}s CPU time budget")
+    
+    def __enter__(self):
+        import signal
+        import threading
+        
+        if (self.seconds and hasattr(signal, 'setitimer')
+                and threading.current_thread() is threading.main_thread()):
+            self._previous_handler = signal.signal(signal.SIGPROF, self._expired)
+            signal.setitimer(signal.ITIMER_PROF, self.seconds)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        import signal
+        
+        if self._previous_handler is not None:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+            self._previous_handler = None
+        return False
+
+
+def substitute_markdown_links(content: str, replace) -> str:
+    """Replace markdown links like re.sub(r'\\[.*?\\]\\([^\\)]*\\)', replace, content).
+    
+    The regex takes quadratic time on text with many '[' and no matching
+    '](', such as a minified blob. This scanner gives the same matches in
+    linear time by remembering the next '](', newline and ')' positions
+    instead of rescanning from every '['.
+    
+    Args:
+        content: Text to search
+        replace: Function called with each matched link, returning its replacement
+    """
+    parts = []
+    pos = 0
+    close_index = newline_index = paren_index = -1
+    open_index = content.find('[')
+    
+    while open_index != -1:
+        # The link text runs to the first '](' on the same line
+        if close_index <= open_index:
+            close_index = content.find('](', open_index + 1)
+            if close_index == -1:
+                break
+        if newline_index <= open_index:
+            newline_index = content.find('\n', open_index + 1)
+            if newline_index == -1:
+                newline_index = len(content)
+        if close_index > newline_index:
+            open_index = content.find('[', open_index + 1)
+            continue
+        
+        # The URL runs to the first ')', across lines
+        if paren_index < close_index + 2:
+            paren_index = content.find(')', close_index + 2)
+            if paren_index == -1:
+                break
+        
+        parts.append(content[pos:open_index])
+        parts.append(replace(content[open_index:paren_index + 1]))
+        pos = paren_index + 1
+        open_index = content.find('[', pos)
+    
+    parts.append(content[pos:])
+    return ''.join(parts)
+
+
+def substitute_angle_brackets(content: str, replace) -> str:
+    """Replace <...> spans like re.sub(r'<[^>]*>', replace, content), in linear time.
+    
+    Args:
+        content: Text to search
+        replace: Function called with each matched span, returning its replacement
+    """
+    parts = []
+    pos = 0
+    open_index = content.find('<')
+    
+    while open_index != -1:
+        close_index = content.find('>', open_index + 1)
+        if close_index == -1:
+            # No '<' after this one can match either
+            break
+        parts.append(content[pos:open_index])
+        parts.append(replace(content[open_index:close_index + 1]))
+        pos = close_index + 1
+        open_index = content.find('<', pos)
+    
+    parts.append(content[pos:])
+    return ''.join(parts)
+
+
+def find_tags_block(frontmatter: str) -> Optional[Tuple[int, int, List[str]]]:
+    """Locate the list under a 'tags:' line in linear time.
+    
+    Matches what re.search(r'^tags:\\s*\\n((?:\\s*-\\s*.+\\n?)*)', frontmatter,
+    re.MULTILINE) matches, without the backtracking that pattern can do on
+    long runs of whitespace and list items.
+    
+    Returns:
+        (start, end, items): Span of the list after the 'tags:' line and the
+        text of each item, or None if there is no such 'tags:' line
+    """
+    length = len(frontmatter)
+    index = 0 if frontmatter.startswith('tags:') else frontmatter.find('\ntags:')
+    
+    while index != -1:
+        if frontmatter[index] == '\n':
+            index += 1
+        
+        # 'tags:' must be followed by whitespace containing a newline; the
+        # list starts after the last newline in that whitespace
+        pos = index + 5
+        while pos < length and frontmatter[pos].isspace():
+            pos += 1
+        start = frontmatter.rfind('\n', index + 5, pos) + 1
+        if start:
+            break
+        index = frontmatter.find('\ntags:', index)
+    else:
+        return None
+    
+    items = []
+    end = start
+    while True:
+        # Each item: optional whitespace, '-', optional whitespace, then the rest of the line
+        pos = end
+        while pos < length and frontmatter[pos].isspace():
+            pos += 1
+        if pos >= length or frontmatter[pos] != '-':
+            break
+        dash = pos
+        pos += 1
+        while pos < length and frontmatter[pos].isspace():
+            pos += 1
+        if pos >= length:
+            # Only whitespace follows the '-': the item is its last
+            # non-newline character, if there is one
+            last = len(frontmatter.rstrip('\n')) - 1
+            if last > dash:
+                items.append(frontmatter[last])
+                end = min(last + 2, length)
+            break
+        line_end = frontmatter.find('\n', pos)
+        if line_end == -1:
+            line_end = length
+        items.append(frontmatter[pos:line_end])
+        end = line_end + 1 if line_end < length else length
+    
+    return start, end, items
+
+
+def replace_tags_section(frontmatter: str, replacement: str) -> str:
+    """Replace every 'tags:' section of the frontmatter, in linear time.
+    
+    Same as re.sub(r'^tags:.*?(?=\\n\\w|\\n---|\\Z)', replacement, frontmatter,
+    flags=re.MULTILINE | re.DOTALL): a section runs from a 'tags:' line up to
+    the next line that starts with a word character or '---'. The
+    replacement is inserted literally.
+    """
+    import re
+    
+    word_start = re.compile(r'\n(?:\w|---)')
+    parts = []
+    pos = 0
+    index = 0 if frontmatter.startswith('tags:') else frontmatter.find('\ntags:')
+    
+    while index != -1:
+        if frontmatter[index] == '\n':
+            index += 1
+        end_match = word_start.search(frontmatter, index + 5)
+        end = end_match.start() if end_match else len(frontmatter)
+        parts.append(frontmatter[pos:index])
+        parts.append(replacement)
+        pos = end
+        index = frontmatter.find('\ntags:', end)
+    
+    parts.append(frontmatter[pos:])
+    return ''.join(parts)
 
 
 def has_frontmatter(content: str) -> bool:
@@ -16,6 +511,29 @@ def has_frontmatter(content: str) -> bool:
     return content.strip().startswith('---')
 
 
+class MalformedFrontmatter(ValueError):
+    """Raised for notes that seem to start with frontmatter but can't be split into frontmatter and body."""
+
+
+# Frontmatter block at the start of a note; it may be empty, and its closing
+# '---' may be the last line of the file, without a newline
+FRONTMATTER_PATTERN = r'---\n(?:(.*?)\n)?---(?:\n|\Z)'
+
+
+def split_frontmatter(content: str) -> Optional[Tuple[str, str]]:
+    """Split a note into its frontmatter (without the --- lines) and its body.
+    
+    Returns:
+        (frontmatter, body), or None if the note doesn't start with a complete frontmatter block
+    """
+    import re
+    
+    match = re.match(FRONTMATTER_PATTERN, content, re.DOTALL)
+    if not match:
+        return None
+    return match.group(1) or '', content[match.end():]
+
+
 def extract_existing_tags_from_frontmatter(frontmatter: str) -> List[str]:
     """Extract existing tags from YAML frontmatter.
     
@@ -25,16 +543,13 @@ def extract_existing_tags_from_frontmatter(frontmatter: str) -> List[str]:
     Returns:
         List of existing tags
     """
-    import re
-    
     existing_tags = []
     
     # Look for tags section in frontmatter
-    tags_match = re.search(r'^tags:\s*\n((?:\s*-\s*.+\n?)*)', frontmatter, re.MULTILINE)
-    if tags_match:
-        tags_section = tags_match.group(1)
+    tags_block = find_tags_block(frontmatter)
+    if tags_block:
         # Extract individual tags
-        tag_matches = re.findall(r'^\s*-\s*(.+)$', tags_section, re.MULTILINE)
+        _, _, tag_matches = tags_block
         existing_tags = [tag.strip() for tag in tag_matches if tag.strip()]
     
     return existing_tags
@@ -85,43 +600,151 @@ def clean_old_properties_and_migrate(frontmatter: str) -> Tuple[str, str]:
     return cleaned_frontmatter, migrated_area
 
 
-def clean_url_generated_tags(tags_list: List[str]) -> List[str]:
+class UrlTagRules:
+    """Compiled set of rules recognising tags that were generated from URLs.
+    
+    The built-in kinds of rule are combined into a single regex that is
+    compiled once. Custom regexes are compiled and tried on their own, after
+    those, so their groups, backreferences and inline flags work as written.
+    The verdict for each distinct tag is memoized since tags repeat heavily
+    across a vault. Every removal is counted per rule for reporting.
+    """
+    
+    # Defaults matching the patterns the script has always used
+    DEFAULT_RULES = {
+        'prefixes': ['pdp-', 'utm-', 'utm_', 'ref-', 'ref_'],
+        'suffixes': ['-container', '-wrapper', '-section'],
+        'number_min_length': 8,
+        'hex_min_length': 8,
+        'regexes': [r'^post-\d+$'],
+    }
+    
+    def __init__(self, rules: Optional[dict] = None):
+        import re
+        from collections import Counter, defaultdict
+        
+        config = dict(self.DEFAULT_RULES)
+        if rules:
+            if not isinstance(rules, dict):
+                raise ValueError(f"URL tag rules must be an object of rule keys, not {rules!r}")
+            unknown = set(rules) - set(self.DEFAULT_RULES)
+            if unknown:
+                raise ValueError(f"Unknown URL tag rule keys: {', '.join(sorted(unknown))}")
+            config.update(rules)
+        for key in ('prefixes', 'suffixes', 'regexes'):
+            if not isinstance(config[key], list) or not all(isinstance(item, str) and item for item in config[key]):
+                raise ValueError(f"URL tag rule {key!r} must be a list of non-empty strings, not {config[key]!r}")
+        for key in ('number_min_length', 'hex_min_length'):
+            value = config[key]
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise ValueError(f"URL tag rule {key!r} must be a non-negative integer, not {value!r}")
+        self.config = config
+        
+        # (rule name, regex) in the order rules are tried
+        alternatives = []
+        for prefix in config['prefixes']:
+            alternatives.append((f"prefix {prefix}", re.escape(prefix)))
+        for suffix in config['suffixes']:
+            alternatives.append((f"suffix {suffix}", rf'.*{re.escape(suffix)}$'))
+        if config['number_min_length']:
+            length = config['number_min_length']
+            alternatives.append((f"number >= {length} digits", rf'[0-9]{{{length},}}$'))
+        if config['hex_min_length']:
+            length = config['hex_min_length']
+            alternatives.append((f"hex >= {length} chars", rf'[a-f0-9]{{{length},}}$'))
+        
+        self.rule_names = {f'_rule{i}': name for i, (name, _) in enumerate(alternatives)}
+        combined = '|'.join(f'(?P<_rule{i}>{regex})' for i, (_, regex) in enumerate(alternatives))
+        self._matcher = re.compile(combined, re.IGNORECASE) if alternatives else None
+        
+        # (rule name, compiled regex) for the custom regexes
+        self._custom = []
+        for regex in config['regexes']:
+            try:
+                self._custom.append((f"regex {regex}", re.compile(regex, re.IGNORECASE)))
+            except re.error as e:
+                raise ValueError(f"Invalid URL tag regex {regex!r}: {e}") from None
+        self._verdicts = {}
+        self.removed = defaultdict(Counter)
+    
+    @classmethod
+    def from_file(cls, config_path: Path) -> 'UrlTagRules':
+        """Load rules from a JSON file with any of the keys in DEFAULT_RULES."""
+        import json
+        
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+    
+    def match(self, tag: str) -> Optional[str]:
+        """Return the name of the rule that flags the tag, or None if it is kept."""
+        try:
+            return self._verdicts[tag]
+        except KeyError:
+            pass
+        
+        verdict = None
+        if self._matcher is not None:
+            match = self._matcher.match(tag)
+            if match:
+                verdict = self.rule_names[match.lastgroup]
+        if verdict is None:
+            for name, pattern in self._custom:
+                if pattern.match(tag):
+                    verdict = name
+                    break
+        self._verdicts[tag] = verdict
+        return verdict
+    
+    def filter(self, tags_list: List[str]) -> List[str]:
+        """Return the tags that no rule flags, counting the ones removed."""
+        cleaned_tags = []
+        for tag in tags_list:
+            rule = self.match(tag)
+            if rule is None:
+                cleaned_tags.append(tag)
+            else:
+                self.removed[rule][tag] += 1
+        return cleaned_tags
+    
+    def fingerprint(self) -> str:
+        """Return a hash identifying these rules, to invalidate caches when they change."""
+        import hashlib
+        import json
+        
+        return hashlib.sha256(json.dumps(self.config, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def merge_removed(self, removed: dict) -> None:
+        """Add removal counts collected by another process to this rule set."""
+        for rule, tags in removed.items():
+            self.removed[rule].update(tags)
+    
+    def report(self) -> List[str]:
+        """Describe which rule removed which tags, with counts."""
+        lines = []
+        for rule, tags in sorted(self.removed.items(), key=lambda item: -sum(item[1].values())):
+            lines.append(f"  {rule}: {sum(tags.values())} removed")
+            for tag, count in tags.most_common():
+                lines.append(f"    {tag}: {count}")
+        return lines
+
+
+# Rules used by clean_url_generated_tags unless others are passed in
+url_tag_rules = UrlTagRules()
+
+
+def clean_url_generated_tags(tags_list: List[str], rules: Optional[UrlTagRules] = None) -> List[str]:
     """Remove tags that look like they were generated from URLs.
     
     Args:
         tags_list: List of existing tags
+        rules: Rule set to apply, defaults to the module-wide url_tag_rules
         
     Returns:
         Cleaned list of tags without URL-generated ones
     """
-    import re
-    
-    cleaned_tags = []
-    
-    # Patterns that indicate a tag was likely generated from a URL
-    url_tag_patterns = [
-        r'^pdp-.*',  # Product detail page patterns
-        r'^post-\d+$',  # Post ID patterns
-        r'^[a-f0-9]{8,}$',  # Long hex strings (hashes)
-        r'^utm[-_].*',  # UTM parameters
-        r'^ref[-_].*',  # Referral parameters
-        r'^[0-9]{8,}$',  # Long number sequences
-        r'.*-container$',  # Container suffixes common in URLs
-        r'.*-wrapper$',   # Wrapper suffixes common in URLs
-        r'.*-section$',   # Section suffixes common in URLs
-    ]
-    
-    for tag in tags_list:
-        is_url_tag = False
-        for pattern in url_tag_patterns:
-            if re.match(pattern, tag, re.IGNORECASE):
-                is_url_tag = True
-                break
-        
-        if not is_url_tag:
-            cleaned_tags.append(tag)
-    
-    return cleaned_tags
+    if rules is None:
+        rules = url_tag_rules
+    return rules.filter(tags_list)
 
 
 def reorder_frontmatter_properties(frontmatter: str) -> str:
@@ -142,15 +765,13 @@ def reorder_frontmatter_properties(frontmatter: str) -> str:
     properties = {}
     
     # Handle tags specially since they can be multi-line
-    tags_match = re.search(r'^tags:\s*\n((?:\s*-\s*.+\n?)*)', frontmatter, re.MULTILINE)
-    if tags_match:
-        full_tags = f"tags:\n{tags_match.group(1).rstrip()}"
+    tags_block = find_tags_block(frontmatter)
+    if tags_block:
+        start, end, _ = tags_block
+        full_tags = f"tags:\n{frontmatter[start:end].rstrip()}"
         properties['tags'] = full_tags
         # Remove tags from frontmatter for other property processing
-        frontmatter_without_tags = re.sub(
-            r'^tags:.*?(?=\n\w|\n---|\Z)', '', frontmatter,
-            flags=re.MULTILINE | re.DOTALL
-        )
+        frontmatter_without_tags = replace_tags_section(frontmatter, '')
     else:
         # Check for empty tags line
         tags_empty_match = re.search(r'^tags:\s*$', frontmatter, re.MULTILINE)
@@ -165,7 +786,7 @@ def reorder_frontmatter_properties(frontmatter: str) -> str:
         if prop == 'tags':
             continue  # Already handled above
         
-        prop_match = re.search(rf'^{prop}:\s*(.*)$', frontmatter_without_tags, re.MULTILINE)
+        prop_match = re.search(rf'^{prop}:[ \t]*(.*)$', frontmatter_without_tags, re.MULTILINE)
         if prop_match:
             value = prop_match.group(1).strip()
             properties[prop] = f"{prop}: {value}"
@@ -179,53 +800,82 @@ def reorder_frontmatter_properties(frontmatter: str) -> str:
     return '\n'.join(ordered_lines)
 
 
-def update_existing_frontmatter(content: str, file_path: Path) -> Tuple[str, bool]:
-    """Update existing frontmatter to add missing properties.
+def find_frontmatter_issues(frontmatter: str) -> dict:
+    """Find everything that keeps existing frontmatter from being compliant.
     
     Args:
-        content: The file content with existing frontmatter
-        file_path: Path to the file for context extraction
-        
+        frontmatter: The existing frontmatter content (without the --- lines)
+    
     Returns:
-        (updated_content, was_updated): Tuple of updated content and whether changes were made
+        Dict with the legacy, missing and misordered properties, URL-generated
+        tags, plus the cleaned frontmatter, migrated area and cleaned tags
+        needed to fix them
     """
     import re
     
-    # Extract the existing frontmatter
-    frontmatter_match = re.match(r'^---\n(.*?)\n---\n(.*)', content, re.DOTALL)
-    if not frontmatter_match:
-        return content, False
-    
-    existing_frontmatter = frontmatter_match.group(1)
-    body_content = frontmatter_match.group(2)
-    
     # Clean old properties and get migrated area value
-    cleaned_frontmatter, migrated_area = clean_old_properties_and_migrate(existing_frontmatter)
-    has_old_properties = cleaned_frontmatter != existing_frontmatter
+    cleaned_frontmatter, migrated_area = clean_old_properties_and_migrate(frontmatter)
+    legacy_properties = [
+        prop for prop in ['project', 'resource', 'area']
+        if re.search(rf'^{prop}:', frontmatter, re.MULTILINE)
+    ]
     
-    # Check which properties are missing
+    # Check which properties are missing, and the order the others appear in
     required_properties = ['created', 'para', 'category', 'subcategory', 'priority', 'tags', 'archived']
-    missing_properties = []
-    
-    for prop in required_properties:
-        if not re.search(rf'^{prop}:', cleaned_frontmatter, re.MULTILINE):
-            missing_properties.append(prop)
+    positions = {}
     
-    # Check if properties are in the correct order
-    current_order = []
     for prop in required_properties:
-        if re.search(rf'^{prop}:', cleaned_frontmatter, re.MULTILINE):
-            current_order.append(prop)
+        prop_match = re.search(rf'^{prop}:', cleaned_frontmatter, re.MULTILINE)
+        if prop_match:
+            positions[prop] = prop_match.start()
     
-    needs_reordering = current_order != [prop for prop in required_properties if prop in current_order]
+    missing_properties = [prop for prop in required_properties if prop not in positions]
+    current_order = sorted(positions, key=positions.get)
+    misordered = current_order != [prop for prop in required_properties if prop in positions]
     
     # Clean existing tags from URL-generated ones
     existing_tags = extract_existing_tags_from_frontmatter(cleaned_frontmatter)
     cleaned_existing_tags = clean_url_generated_tags(existing_tags)
-    needs_tag_cleanup = len(cleaned_existing_tags) != len(existing_tags)
+    
+    return {
+        'cleaned_frontmatter': cleaned_frontmatter,
+        'migrated_area': migrated_area,
+        'legacy_properties': legacy_properties,
+        'missing_properties': missing_properties,
+        'misordered': misordered,
+        'has_tags': 'tags' in positions,
+        'cleaned_existing_tags': cleaned_existing_tags,
+        'url_tags': [tag for tag in existing_tags if tag not in cleaned_existing_tags],
+    }
+
+
+def update_existing_frontmatter(content: str, file_path: Path) -> Tuple[str, bool]:
+    """Update existing frontmatter to add missing properties.
+    
+    Args:
+        content: The file content with existing frontmatter
+        file_path: Path to the file for context extraction
+        
+    Returns:
+        (updated_content, was_updated): Tuple of updated content and whether changes were made
+    """
+    # Extract the existing frontmatter
+    parts = split_frontmatter(content)
+    if parts is None:
+        return content, False
+    existing_frontmatter, body_content = parts
+    
+    issues = find_frontmatter_issues(existing_frontmatter)
+    cleaned_frontmatter = issues['cleaned_frontmatter']
+    migrated_area = issues['migrated_area']
+    has_old_properties = bool(issues['legacy_properties'])
+    missing_properties = issues['missing_properties']
+    needs_reordering = issues['misordered']
+    cleaned_existing_tags = issues['cleaned_existing_tags']
+    needs_tag_cleanup = bool(issues['url_tags'])
+    has_existing_tags = issues['has_tags']
     
     # Check if we need to update existing tags with new ones from content
-    has_existing_tags = bool(re.search(r'^tags:', cleaned_frontmatter, re.MULTILINE))
     new_tags_from_content = extract_remaining_tags(body_content)
     needs_tag_update = has_existing_tags and (new_tags_from_content or needs_tag_cleanup)
     
@@ -255,12 +905,7 @@ def update_existing_frontmatter(content: str, file_path: Path) -> Tuple[str, boo
             new_tags_section = "tags:"
         
         # Replace the existing tags section
-        updated_frontmatter = re.sub(
-            r'^tags:.*?(?=\n\w|\n---|\Z)',
-            new_tags_section,
-            cleaned_frontmatter,
-            flags=re.MULTILINE | re.DOTALL
-        )
+        updated_frontmatter = replace_tags_section(cleaned_frontmatter, new_tags_section)
     else:
         updated_frontmatter = cleaned_frontmatter
     
@@ -355,14 +1000,16 @@ def extract_remaining_tags(content: str) -> List[str]:
     url_patterns = [
         r'https?://[^\s\]]+',  # http/https URLs
         r'www\.[^\s\]]+',      # www URLs
-        r'\[.*?\]\([^\)]*\)',  # Markdown links [text](url)
-        r'<[^>]*>',            # Angle bracket URLs <url>
     ]
     
     content_without_urls = content
     for pattern in url_patterns:
         content_without_urls = re.sub(pattern, '', content_without_urls, flags=re.IGNORECASE)
     
+    # Markdown links [text](url) and angle bracket URLs <url>, matched in linear time
+    content_without_urls = substitute_markdown_links(content_without_urls, lambda url: '')
+    content_without_urls = substitute_angle_brackets(content_without_urls, lambda url: '')
+    
     # Find all hashtags in content without URLs
     all_tags = re.findall(r'#(\w+(?:-\w+)*)', content_without_urls)
     
@@ -394,20 +1041,20 @@ def remove_all_tags(content: str) -> str:
     url_patterns = [
         r'https?://[^\s\]]+',  # http/https URLs
         r'www\.[^\s\]]+',      # www URLs
-        r'\[.*?\]\([^\)]*\)',  # Markdown links [text](url)
-        r'<[^>]*>',            # Angle bracket URLs <url>
     ]
     
+    def replace_url(url):
+        urls.append(url)
+        return f"__URL_PLACEHOLDER_{len(urls) - 1}__"
+    
     protected_content = content
-    url_counter = 0
     for pattern in url_patterns:
-        def replace_url(match):
-            nonlocal url_counter
-            urls.append(match.group(0))
-            placeholder = f"__URL_PLACEHOLDER_{url_counter}__"
-            url_counter += 1
-            return placeholder
-        protected_content = re.sub(pattern, replace_url, protected_content, flags=re.IGNORECASE)
+        protected_content = re.sub(pattern, lambda match: replace_url(match.group(0)),
+                                   protected_content, flags=re.IGNORECASE)
+    
+    # Markdown links [text](url) and angle bracket URLs <url>, matched in linear time
+    protected_content = substitute_markdown_links(protected_content, replace_url)
+    protected_content = substitute_angle_brackets(protected_content, replace_url)
     
     # Remove hashtags from protected content
     protected_content = re.sub(r'#\w+(?:-\w+)*\s*', '', protected_content)
@@ -644,56 +1291,423 @@ def should_exclude_path(file_path: Path, exclude_folders: List[str], exclude_fil
     return False
 
 
-def process_markdown_file(file_path: Path, dry_run: bool = False) -> Tuple[bool, bool]:
+def transform_note(content: str, file_path: Path) -> Tuple[str, bool]:
+    """Add or update the properties of a note and remove tags from its body.
+    
+    Args:
+        content: Note content
+        file_path: Path to the markdown file
+    
+    Returns:
+        (updated_content, properties_added): The new content and whether it changed
+    
+    Raises:
+        MalformedFrontmatter: If the note seems to start with frontmatter that
+            isn't a complete block; it is left unchanged
+    """
+    properties_added = False
+    updated_content = content
+    
+    # Handle frontmatter - add if missing or update if incomplete
+    if not has_frontmatter(content):
+        # Add front matter to the beginning of the file
+        updated_content = create_frontmatter(file_path, content) + remove_all_tags(content)
+        properties_added = True
+    else:
+        if split_frontmatter(content) is None:
+            raise MalformedFrontmatter("malformed frontmatter")
+        
+        # Update existing frontmatter if missing properties
+        updated_content, was_updated = update_existing_frontmatter(content, file_path)
+        if was_updated:
+            properties_added = True
+        
+        # Remove all tags from the body content if there are any tags
+        remaining_tags = extract_remaining_tags(content)
+        has_cat_tags = bool(extract_subcategory_from_content(content))
+        has_priority_tags = bool(extract_priority_from_content(content))
+        
+        if remaining_tags or has_cat_tags or has_priority_tags:
+            # Extract body content and remove all tags
+            parts = split_frontmatter(updated_content)
+            if parts is not None:
+                body_part = parts[1]
+                frontmatter_part = updated_content[:len(updated_content) - len(body_part)]
+                cleaned_body = remove_all_tags(body_part)
+                updated_content = frontmatter_part + cleaned_body
+                properties_added = True  # Mark as updated since we removed tags
+    
+    return updated_content, properties_added
+
+
+def update_markdown_content(file_path: Path, dry_run: bool = False,
+                            throttle: Optional[IOThrottle] = None, time_budget: float = 0,
+                            properties_path: Optional[Path] = None) -> bool:
+    """Add or update the properties of a single markdown file in place.
+    
+    Args:
+        file_path: Path to the markdown file
+        dry_run: Don't write anything
+        throttle: Optional I/O rate limiter applied to reads and writes
+        time_budget: CPU seconds allowed for transforming the note, 0 for no limit
+        properties_path: Path to derive the properties from instead of
+            file_path, e.g. that of the copy a skipped duplicate must match
+    
+    Returns:
+        Whether the content was (or would be) changed
+    
+    Raises:
+        FileTimeBudgetExceeded: If transforming the note takes longer than
+            time_budget; the file is left unchanged
+    """
+    # Skip reading and decoding notes the byte-level prefilter shows are compliant
+    if not note_needs_update(file_path, throttle):
+        return False
+    
+    content, encoding = read_note(file_path, throttle, acquired=True)
+    
+    with cpu_time_budget(time_budget):
+        updated_content, properties_added = transform_note(content, properties_path or file_path)
+    
+    # Write the updated content if changes were made
+    if properties_added and not dry_run:
+        write_note(file_path, updated_content, throttle, encoding)
+    
+    return properties_added
+
+
+# Digests of files already hashed, keyed by (path, size, mtime)
+file_digest_cache = {}
+
+
+def file_digest(file_path: Path, chunk_size: int = 1024 * 1024,
+                throttle: Optional[IOThrottle] = None) -> str:
+    """Return the SHA-256 of a file, reading it in chunks.
+    
+    The read is charged to the I/O throttle, if one is given, like a note read.
+    """
+    import hashlib
+    
+    stat = file_path.stat()
+    key = (file_path, stat.st_size, stat.st_mtime_ns)
+    if key not in file_digest_cache:
+        if throttle is not None:
+            throttle.acquire(stat.st_size)
+        start = time.monotonic()
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        if throttle is not None:
+            throttle.record_latency(time.monotonic() - start)
+        file_digest_cache[key] = digest.hexdigest()
+    return file_digest_cache[key]
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count for the summary, e.g. 1536 -> '1.5 KiB'."""
+    size = float(num_bytes)
+    for unit in ['bytes', 'KiB', 'MiB', 'GiB']:
+        if size < 1024 or unit == 'GiB':
+            return f"{num_bytes} bytes" if unit == 'bytes' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def files_identical(path_a: Path, path_b: Path, throttle: Optional[IOThrottle] = None) -> bool:
+    """Check whether two files have the same content, comparing sizes before hashing."""
+    if path_a.stat().st_size != path_b.stat().st_size:
+        return False
+    return file_digest(path_a, throttle=throttle) == file_digest(path_b, throttle=throttle)
+
+
+def plan_file_moves(markdown_files: List[Path], duplicates: str = 'keep',
+                    throttle: Optional[IOThrottle] = None) -> Tuple[dict, dict]:
+    """Decide up front where every file in a PARA subdirectory will be moved.
+    
+    Files are considered in processing order and name conflicts are resolved
+    with _1, _2, ... suffixes exactly as if the moves happened one by one, so
+    the plan can be journaled and replayed after an interrupted run.
+    
+    Unless duplicates is 'keep', a file that conflicts with an identical copy
+    (an existing file or one planned to move there) is recorded as a duplicate
+    of it instead, and only takes a numbered name under the 'link' policy.
+    
+    Args:
+        markdown_files: Files in the order they will be processed
+        duplicates: Duplicates policy, see handle_duplicate
+        throttle: Optional I/O rate limiter applied to the duplicate hashing
+    
+    Returns:
+        (moves, duplicate_of): Dicts mapping each file that should move to its
+        target path, and each exact duplicate to the destination path of its copy
+    """
+    moves = {}
+    duplicate_of = {}
+    moved_away = set()
+    planned_targets = {}
+    
+    def occupant(path: Path) -> Optional[Path]:
+        # The file whose content will be at path when this move happens
+        if path in planned_targets:
+            return planned_targets[path]
+        if path not in moved_away and path.exists():
+            return path
+        return None
+    
+    for file_path in markdown_files:
+        should_move, new_path = should_move_file(file_path)
+        if not should_move:
+            continue
+        
+        # Handle filename conflicts
+        counter = 1
+        original_new_path = new_path
+        identical_path = None
+        while True:
+            holder = occupant(new_path)
+            if holder is None:
+                break
+            if duplicates != 'keep' and identical_path is None and files_identical(holder, file_path, throttle):
+                identical_path = new_path
+                if duplicates != 'link':
+                    break
+            stem = original_new_path.stem
+            suffix = original_new_path.suffix
+            new_path = original_new_path.parent / f"{stem}_{counter}{suffix}"
+            counter += 1
+        
+        if identical_path is not None:
+            duplicate_of[file_path] = identical_path
+            if duplicates == 'skip':
+                continue
+            moved_away.add(file_path)
+            if duplicates == 'merge':
+                continue
+        
+        moves[file_path] = new_path
+        moved_away.add(file_path)
+        planned_targets[new_path] = file_path
+    
+    return moves, duplicate_of
+
+
+class RunJournal:
+    """Append-only checkpoint journal that lets an interrupted run be resumed.
+    
+    The journal is a file of JSON lines. It starts with the list of files and
+    the move plan, written in batches, followed by batches of completed file
+    indices. Completions are buffered and appended every batch_size files or
+    flush_interval seconds, so journaling costs almost nothing per file.
+    The journal is deleted once a run completes.
+    """
+    
+    def __init__(self, journal_path: Path, batch_size: int = 512, flush_interval: float = 2.0):
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._file = None
+    
+    @staticmethod
+    def load(journal_path: Path, directory: Path) -> Optional[dict]:
+        """Read a journal left by an interrupted run.
+        
+        Returns:
+            Dict with 'files' (list of paths), 'moves' (dict of path to target),
+            'duplicate_of' (dict of path to its identical copy), 'policy' (the
+            duplicates policy) and 'done' (dict of file index to
+            (properties_added, file_moved)), or None if there is no journal
+            with a complete plan
+        """
+        import json
+        
+        if not journal_path.exists():
+            return None
+        
+        files = []
+        moves = {}
+        duplicate_of = {}
+        done = {}
+        policy = 'keep'
+        plan_complete = False
+        
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from the interruption
+                    break
+                if 'files' in record:
+                    files.extend(directory / name for name in record['files'])
+                elif 'moves' in record:
+                    moves.update((files[index], directory / target) for index, target in record['moves'])
+                elif 'duplicates' in record:
+                    duplicate_of.update((files[index], directory / copy) for index, copy in record['duplicates'])
+                elif 'planned' in record:
+                    plan_complete = record['planned'] == len(files)
+                    policy = record.get('policy', 'keep')
+                elif 'done' in record:
+                    done.update((index, (bool(added), bool(moved))) for index, added, moved in record['done'])
+        
+        if not plan_complete:
+            return None
+        return {'files': files, 'moves': moves, 'duplicate_of': duplicate_of,
+                'policy': policy, 'done': done}
+    
+    def start(self, directory: Path, markdown_files: List[Path], moves: dict,
+              duplicate_of: Optional[dict] = None, policy: str = 'keep') -> None:
+        """Begin a new journal with the file list, move plan and duplicates."""
+        import json
+        
+        self._file = open(self.journal_path, 'w', encoding='utf-8')
+        indices = {file_path: index for index, file_path in enumerate(markdown_files)}
+        
+        for start in range(0, len(markdown_files), self.batch_size):
+            batch = markdown_files[start:start + self.batch_size]
+            names = [file_path.relative_to(directory).as_posix() for file_path in batch]
+            self._file.write(json.dumps({'files': names}) + '\n')
+        
+        planned = list(moves.items())
+        for start in range(0, len(planned), self.batch_size):
+            batch = [
+                [indices[source], target.relative_to(directory).as_posix()]
+                for source, target in planned[start:start + self.batch_size]
+            ]
+            self._file.write(json.dumps({'moves': batch}) + '\n')
+        
+        duplicates = list((duplicate_of or {}).items())
+        for start in range(0, len(duplicates), self.batch_size):
+            batch = [
+                [indices[source], copy.relative_to(directory).as_posix()]
+                for source, copy in duplicates[start:start + self.batch_size]
+            ]
+            self._file.write(json.dumps({'duplicates': batch}) + '\n')
+        
+        self._file.write(json.dumps({'planned': len(markdown_files), 'policy': policy}) + '\n')
+        self._file.flush()
+    
+    def resume(self) -> None:
+        """Continue appending to an existing journal."""
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+    
+    def record(self, index: int, properties_added: bool, file_moved: bool) -> None:
+        """Record that a file is finished, appending a batch when one is full."""
+        self._pending.append([index, int(properties_added), int(file_moved)])
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+    
+    def flush(self) -> None:
+        """Append all buffered completions to the journal."""
+        import json
+        
+        if self._pending:
+            self._file.write(json.dumps({'done': self._pending}, separators=(',', ':')) + '\n')
+            self._file.flush()
+            self._pending = []
+        self._last_flush = time.monotonic()
+    
+    def close(self, completed: bool) -> None:
+        """Flush and close the journal, deleting it if the run completed."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        if completed:
+            self.journal_path.unlink()
+
+
+def handle_duplicate(file_path: Path, duplicate_of: Path, policy: str, new_path: Optional[Path] = None,
+                     dry_run: bool = False, duplicate_report: Optional[dict] = None) -> bool:
+    """Apply the duplicates policy to a file identical to one at its destination.
+    
+    Policies:
+        skip:  leave the file where it is
+        merge: delete the file, keeping the copy at the destination
+        link:  replace the file with a hard link to the copy, named new_path
+    
+    Returns:
+        Whether the file left its subdirectory
+    """
+    import os
+    
+    size = file_path.stat().st_size
+    
+    if policy == 'link' and not dry_run:
+        try:
+            os.link(duplicate_of, new_path)
+        except OSError as e:
+            # Hard links aren't supported everywhere (e.g. some network shares)
+            print(f"Could not link {new_path} to {duplicate_of}, leaving duplicate in place: {e}")
+            policy = 'skip'
+    
+    if policy in ('merge', 'link') and not dry_run:
+        file_path.unlink()
+    
+    if duplicate_report is not None:
+        duplicate_report.setdefault('files', []).append((file_path, duplicate_of, policy))
+        if policy in ('merge', 'link'):
+            duplicate_report['bytes_saved'] = duplicate_report.get('bytes_saved', 0) + size
+    
+    return policy != 'skip'
+
+
+def process_markdown_file(file_path: Path, dry_run: bool = False,
+                          throttle: Optional[IOThrottle] = None,
+                          move_target: Optional[Path] = None,
+                          duplicate_of: Optional[Path] = None,
+                          duplicates: str = 'keep',
+                          duplicate_report: Optional[dict] = None,
+                          updated: Optional[bool] = None,
+                          properties_path: Optional[Path] = None) -> Tuple[bool, bool]:
     """Process a single markdown file to add properties and move if needed.
     
+    Args:
+        file_path: Path to the markdown file
+        dry_run: Don't write or move anything
+        throttle: Optional I/O rate limiter applied to reads, writes and moves
+        move_target: Target from plan_file_moves; when given it is used as-is
+            instead of resolving name conflicts at move time
+        duplicate_of: Destination path of an identical copy found by
+            plan_file_moves; the file is then handled by the duplicates policy
+        duplicates: Duplicates policy ('skip', 'merge' or 'link')
+        duplicate_report: Optional dict collecting the duplicates handled and
+            the bytes saved
+        updated: Result of update_markdown_content if it already ran for this
+            file (e.g. in a worker process); otherwise it is run here
+        properties_path: Passed on to update_markdown_content
+    
     Returns:
         (properties_added, file_moved): Tuple indicating what actions were taken
     """
     import shutil
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # A resumed run may find the planned move (or duplicate merge) already done
+        if (move_target is not None or duplicate_of is not None) and not file_path.exists():
+            return False, True
         
-        properties_added = False
-        file_moved = False
-        updated_content = content
+        if duplicate_of is not None:
+            if handle_duplicate(file_path, duplicate_of, duplicates, move_target, dry_run, duplicate_report):
+                return False, True
+            # A skipped duplicate stays where it is, but its content is still updated
+            if updated is None:
+                updated = update_markdown_content(file_path, dry_run, throttle, properties_path=properties_path)
+            return updated, False
         
-        # Handle frontmatter - add if missing or update if incomplete
-        if not has_frontmatter(content):
-            # Add front matter to the beginning of the file
-            updated_content = create_frontmatter(file_path, content) + remove_all_tags(content)
-            properties_added = True
-        else:
-            # Update existing frontmatter if missing properties
-            updated_content, was_updated = update_existing_frontmatter(content, file_path)
-            if was_updated:
-                properties_added = True
-            
-            # Remove all tags from the body content if there are any tags
-            remaining_tags = extract_remaining_tags(content)
-            has_cat_tags = bool(extract_subcategory_from_content(content))
-            has_priority_tags = bool(extract_priority_from_content(content))
-            
-            if remaining_tags or has_cat_tags or has_priority_tags:
-                # Extract body content and remove all tags
-                import re
-                frontmatter_match = re.match(r'^(---\n.*?\n---\n)(.*)', updated_content, re.DOTALL)
-                if frontmatter_match:
-                    frontmatter_part = frontmatter_match.group(1)
-                    body_part = frontmatter_match.group(2)
-                    cleaned_body = remove_all_tags(body_part)
-                    updated_content = frontmatter_part + cleaned_body
-                    properties_added = True  # Mark as updated since we removed tags
-        
-        # Write the updated content if changes were made
-        if properties_added and not dry_run:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(updated_content)
+        if updated is None:
+            updated = update_markdown_content(file_path, dry_run, throttle)
+        properties_added = updated
+        file_moved = False
         
         # Check if file should be moved from subdirectory to parent PARA directory
-        should_move, new_path = should_move_file(file_path)
+        if move_target is not None:
+            should_move, new_path = True, move_target
+        else:
+            should_move, new_path = should_move_file(file_path)
         
         if should_move:
             if not dry_run:
@@ -703,13 +1717,15 @@ def process_markdown_file(file_path: Path, dry_run: bool = False) -> Tuple[bool,
                 # Handle filename conflicts
                 counter = 1
                 original_new_path = new_path
-                while new_path.exists():
+                while move_target is None and new_path.exists():
                     stem = original_new_path.stem
                     suffix = original_new_path.suffix
                     new_path = original_new_path.parent / f"{stem}_{counter}{suffix}"
                     counter += 1
                 
                 # Move the file
+                if throttle is not None:
+                    throttle.acquire()
                 shutil.move(str(file_path), str(new_path))
             
             file_moved = True
@@ -756,18 +1772,562 @@ def remove_empty_directories(directory: Path, dry_run: bool = False) -> int:
     return removed_count
 
 
-def find_markdown_files(directory: Path, exclude_folders: List[str], exclude_files: List[str]) -> List[Path]:
-    """Find all markdown files in the directory and subdirectories."""
+def find_markdown_files(directory: Path, exclude_folders: List[str], exclude_files: List[str],
+                        throttle: Optional[IOThrottle] = None) -> List[Path]:
+    """Find all markdown files in the directory and subdirectories.
+    
+    With an I/O throttle, each directory the files are found in counts as
+    one operation.
+    """
     markdown_files = []
+    directories = set()
     
     for file_path in directory.rglob("*.md"):
+        if throttle is not None and file_path.parent not in directories:
+            directories.add(file_path.parent)
+            throttle.acquire()
         if not should_exclude_path(file_path, exclude_folders, exclude_files):
             markdown_files.append(file_path)
     
     return markdown_files
 
 
-def main():
+def load_vault_list(list_path: Path) -> List[dict]:
+    """Read the vaults to process from a vault list file.
+    
+    The file is either plain text with one vault path per line (blank lines
+    and lines starting with # are ignored), or, if it ends in .json, a list
+    of paths or of objects with "path" and optional per-vault
+    "exclude_folders" and "exclude_files" lists. Relative paths are
+    resolved against the list file's directory.
+    
+    Returns:
+        List of dicts with 'path', 'exclude_folders' and 'exclude_files'
+    """
+    import json
+    
+    with open(list_path, 'r', encoding='utf-8') as f:
+        if list_path.suffix.lower() == '.json':
+            entries = json.load(f)
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    
+    if not isinstance(entries, list):
+        raise ValueError("expected a list of vaults")
+    
+    vaults = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'path': entry}
+        if not isinstance(entry, dict) or 'path' not in entry:
+            raise ValueError(f"invalid vault entry: {entry!r}")
+        vaults.append({
+            'path': list_path.parent / Path(entry['path']).expanduser(),
+            'exclude_folders': list(entry.get('exclude_folders', [])),
+            'exclude_files': list(entry.get('exclude_files', [])),
+        })
+    return vaults
+
+
+class ComplianceCache:
+    """On-disk record of notes known to need no changes, shared by all vaults.
+    
+    Stored in SQLite, keyed by absolute path with the size and modification
+    time the note had when it was found compliant. Any change to the note,
+    to the URL tag rules or to this script's rules invalidates the entry.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, cache_path: Path, rules_fingerprint: str):
+        import sqlite3
+        
+        self._db = sqlite3.connect(str(cache_path))
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS compliant (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER)"
+        )
+        
+        # Start over if the rules the entries were judged by have changed
+        fingerprint = f"{self.VERSION}:{rules_fingerprint}"
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        if row is None or row[0] != fingerprint:
+            self._db.execute("DELETE FROM compliant")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (fingerprint,))
+        self._db.commit()
+        self._pending = 0
+    
+    def is_compliant(self, file_path: Path) -> bool:
+        """Check whether the note is unchanged since it was last found compliant."""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        row = self._db.execute(
+            "SELECT size, mtime_ns FROM compliant WHERE path = ?", (str(file_path.resolve()),)
+        ).fetchone()
+        return row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns
+    
+    def mark_compliant(self, file_path: Path) -> None:
+        """Remember that the note, as it is now, needs no changes."""
+        stat = file_path.stat()
+        self._db.execute(
+            "INSERT OR REPLACE INTO compliant VALUES (?, ?, ?)",
+            (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        )
+        self._pending += 1
+        if self._pending >= 1000:
+            self._db.commit()
+            self._pending = 0
+    
+    def close(self) -> None:
+        """Commit outstanding entries and close the database."""
+        self._db.commit()
+        self._db.close()
+
+
+def prepare_vault(directory: Path, exclude_folders: List[str], exclude_files: List[str],
+                  args: argparse.Namespace, throttle: Optional[IOThrottle] = None) -> Optional[dict]:
+    """Find (or resume) the files of one vault and plan their moves.
+    
+    The scan and the duplicate hashing are charged to throttle, if given.
+    
+    Returns:
+        Dict holding the vault's file list, move plan, journal and counters,
+        or None if the vault has no markdown files
+    """
+    # Load the journal of an interrupted run
+    journal_path = Path(args.journal) if args.journal else directory / ".obsidian_properties.journal"
+    previous_run = None
+    if args.resume:
+        previous_run = RunJournal.load(journal_path, directory)
+        if previous_run is None:
+            print(f"No resumable journal found at {journal_path}, starting a new run")
+    elif journal_path.exists() and not args.dry_run:
+        print(f"Replacing the journal of an unfinished run (use --resume to continue it): {journal_path}")
+    
+    if previous_run is not None:
+        markdown_files = previous_run['files']
+        moves = previous_run['moves']
+        duplicate_of = previous_run['duplicate_of']
+        policy = previous_run['policy']
+        completed = previous_run['done']
+        print(f"Resuming run from {journal_path}: {len(completed)} of {len(markdown_files)} files already done")
+    else:
+        # Find all markdown files
+        print(f"Scanning for markdown files in: {directory}")
+        if exclude_folders:
+            print(f"Excluding folders: {', '.join(exclude_folders)}")
+        if exclude_files:
+            print(f"Excluding files: {', '.join(exclude_files)}")
+        
+        markdown_files = find_markdown_files(directory, exclude_folders, exclude_files, throttle)
+        policy = args.duplicates
+        moves, duplicate_of = plan_file_moves(markdown_files, policy, throttle)
+        completed = {}
+    
+    if not markdown_files:
+        print(f"No markdown files found to process in {directory}")
+        return None
+    
+    # A skipped duplicate takes its properties from the path its copy is
+    # updated at, so the two stay identical and the next run skips it again
+    properties_from = {}
+    if policy == 'skip':
+        sources = {target: source for source, target in moves.items()}
+        properties_from = {file_path: sources.get(copy, copy) for file_path, copy in duplicate_of.items()}
+    
+    print(f"Found {len(markdown_files)} markdown files")
+    
+    # Checkpoint progress so an interrupted run can be resumed
+    journal = None
+    if not args.dry_run:
+        journal = RunJournal(journal_path)
+        if previous_run is not None:
+            journal.resume()
+        else:
+            journal.start(directory, markdown_files, moves, duplicate_of, policy)
+    
+    return {
+        'directory': directory,
+        'files': markdown_files,
+        'moves': moves,
+        'duplicate_of': duplicate_of,
+        'properties_from': properties_from,
+        'policy': policy,
+        'completed': completed,
+        'journal': journal,
+        'completed_run': False,
+        'duplicate_report': {},
+        'quarantined': [],
+        'processed_count': 0,
+        'moved_count': 0,
+        'skipped_count': 0,
+    }
+
+
+def schedule_chunks(runs: List[dict], chunk_size: int):
+    """Yield (run, start, end) chunks of files from all vaults for the worker pool.
+    
+    Vaults are interleaved so each advances in proportion to its size, with
+    the largest starting first; a huge vault is then spread over the whole
+    run instead of being the only work left at the end.
+    """
+    import heapq
+    
+    heap = [(0.0, -len(run['files']), i) for i, run in enumerate(runs) if run['files']]
+    heapq.heapify(heap)
+    positions = [0] * len(runs)
+    
+    while heap:
+        _, negative_size, i = heapq.heappop(heap)
+        total = -negative_size
+        start = positions[i]
+        end = min(start + chunk_size, total)
+        positions[i] = end
+        yield runs[i], start, end
+        if end < total:
+            heapq.heappush(heap, (end / total, negative_size, i))
+
+
+def report_file_result(run: dict, file_path: Path, properties_added: bool, file_moved: bool,
+                       args: argparse.Namespace) -> None:
+    """Count and print what happened to one file."""
+    if properties_added:
+        run['processed_count'] += 1
+        status = "WOULD ADD" if args.dry_run else "ADDED"
+        if args.verbose or args.dry_run:
+            print(f"{status} properties to: {file_path}")
+    
+    duplicate = file_path in run['duplicate_of']
+    if duplicate:
+        if args.verbose or args.dry_run:
+            dedup_status = {'skip': "SKIPPED", 'merge': "MERGED", 'link': "LINKED"}[run['policy']]
+            if args.dry_run:
+                dedup_status = f"WOULD {run['policy'].upper()}"
+            print(f"{dedup_status} duplicate: {file_path} = {run['duplicate_of'][file_path]}")
+    elif file_moved:
+        run['moved_count'] += 1
+        move_status = "WOULD MOVE" if args.dry_run else "MOVED"
+        if args.verbose or args.dry_run:
+            print(f"{move_status}: {file_path} → {run['moves'][file_path]}")
+    
+    if not properties_added and not file_moved and not duplicate:
+        run['skipped_count'] += 1
+        if args.verbose:
+            print(f"SKIPPED (already has properties): {file_path}")
+
+
+def print_run_summary(run: dict, args: argparse.Namespace, title: str = "Summary:") -> None:
+    """Print the summary for one vault."""
+    print(f"\n{title}")
+    if args.dry_run:
+        print(f"  Would add properties to: {run['processed_count']} files")
+        print(f"  Would move files: {run['moved_count']} files")
+        if run['removed_dirs_count'] > 0:
+            print(f"  Would remove empty directories: {run['removed_dirs_count']}")
+    else:
+        print(f"  Added properties to: {run['processed_count']} files")
+        print(f"  Moved files: {run['moved_count']} files")
+        if run['removed_dirs_count'] > 0:
+            print(f"  Removed empty directories: {run['removed_dirs_count']}")
+    print(f"  Skipped (no changes needed): {run['skipped_count']} files")
+    print(f"  Total files processed: {len(run['files'])}")
+    if run['completed']:
+        print(f"  Already done before resuming: {len(run['completed'])} files")
+    if run['duplicate_of']:
+        saved = run['duplicate_report'].get('bytes_saved', 0)
+        print(f"  Exact duplicates found: {len(run['duplicate_of'])} files"
+              f" ({format_size(saved)} {'would be ' if args.dry_run else ''}saved)")
+    if run['quarantined']:
+        print(f"  Quarantined (over time budget, left unchanged): {len(run['quarantined'])} files")
+        for file_path in run['quarantined']:
+            print(f"    {file_path}")
+
+
+def find_note_problems(file_path: Path, chunk_size: int = 65536) -> List[str]:
+    """Check a single markdown file for compliance without modifying it.
+    
+    Reading stops as soon as there is evidence of a problem: a note without
+    frontmatter is judged from its first bytes, and a note with frontmatter
+    problems is not read past the frontmatter. The body is only decoded when
+    it contains a '#' followed by a word character.
+    
+    Args:
+        file_path: Path to the markdown file
+        chunk_size: Number of bytes to read at a time
+    
+    Returns:
+        List of problems found, empty if the note is compliant
+    """
+    import re
+    
+    try:
+        with open(file_path, 'rb') as f:
+            # Line endings are normalized as decode_note does; raw keeps the bytes
+            # read so far so a CRLF split between two chunks still counts once
+            raw = f.read(chunk_size)
+            reject_wide_or_binary(raw)
+            head = normalize_line_endings(raw)
+            
+            if not head.startswith(b'---\n'):
+                if head.lstrip().startswith(b'---'):
+                    return ["malformed frontmatter"]
+                return ["missing frontmatter"]
+            
+            # Read on until the end of the frontmatter block, as split_frontmatter
+            # finds it; a closing '---' at the end of what was read so far only
+            # counts once the end of the file confirms it
+            frontmatter_pattern = re.compile(FRONTMATTER_PATTERN.encode('ascii'), re.DOTALL)
+            while True:
+                match = frontmatter_pattern.match(head)
+                if match and (match.end() < len(head) or head.endswith(b'\n')):
+                    break
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    if match:
+                        break
+                    return ["malformed frontmatter"]
+                raw += chunk
+                head = normalize_line_endings(raw)
+            
+            frontmatter, _ = decode_note(match.group(1) or b'')
+            issues = find_frontmatter_issues(frontmatter)
+            
+            problems = []
+            if issues['legacy_properties']:
+                problems.append(f"legacy properties: {', '.join(issues['legacy_properties'])}")
+            if issues['missing_properties']:
+                problems.append(f"missing properties: {', '.join(issues['missing_properties'])}")
+            if issues['misordered']:
+                problems.append("properties out of order")
+            if issues['url_tags']:
+                problems.append(f"URL-generated tags: {', '.join(issues['url_tags'])}")
+            if problems:
+                return problems
+            
+            # Only decode the rest if it could contain tags
+            hashtag_pattern = re.compile(rb'#[0-9A-Za-z_\x80-\xff]')
+            chunks = [raw]
+            data = raw
+            while not hashtag_pattern.search(data):
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return []
+                chunks.append(chunk)
+                # Keep a byte of overlap so a '#' at the end of a chunk is not missed
+                data = data[-1:] + chunk
+            
+            chunks.append(f.read())
+            content, _ = decode_note(b''.join(chunks))
+    
+    except (OSError, UnsupportedEncoding) as e:
+        return [f"unreadable: {e}"]
+    
+    # Same checks the transform uses to decide whether to strip body tags
+    tags = extract_remaining_tags(content)
+    subcategory = extract_subcategory_from_content(content)
+    priority = extract_priority_from_content(content)
+    
+    problems = []
+    if tags:
+        problems.append(f"tags left in body: {', '.join('#' + tag for tag in tags)}")
+    if subcategory:
+        problems.append(f"subcategory tag left in body: #cat-{subcategory}")
+    if priority:
+        problems.append(f"priority tag left in body: #p{priority}")
+    return problems
+
+
+def check_markdown_file(file_path: Path, chunk_size: int = 65536, time_budget: float = 0) -> List[str]:
+    """Check a single markdown file, reporting it as quarantined if it takes too long.
+    
+    Args:
+        file_path: Path to the markdown file
+        chunk_size: Number of bytes to read at a time
+        time_budget: CPU seconds allowed for the check, 0 for no limit
+    
+    Returns:
+        List of problems found, empty if the note is compliant
+    """
+    try:
+        with cpu_time_budget(time_budget):
+            return find_note_problems(file_path, chunk_size)
+    except FileTimeBudgetExceeded as e:
+        return [f"quarantined: {e}"]
+
+
+def init_worker(url_tag_rules_path: Optional[str], throttle_settings: Optional[dict] = None) -> None:
+    """Set up a worker process: compile the URL tag rules and create its I/O throttle.
+    
+    Args:
+        url_tag_rules_path: JSON rules file, or None to keep the current rules
+        throttle_settings: IOThrottle arguments, or None for no throttling
+    """
+    global url_tag_rules, worker_throttle
+    if url_tag_rules_path:
+        url_tag_rules = UrlTagRules.from_file(Path(url_tag_rules_path))
+    worker_throttle = IOThrottle(**throttle_settings) if throttle_settings else None
+
+
+# I/O throttle of the current (worker) process, set by init_worker
+worker_throttle = None
+
+
+def update_files_chunk(file_paths: List[Optional[Path]], dry_run: bool = False,
+                       time_budget: float = 0, properties_paths: Optional[dict] = None) -> Tuple[list, dict, list]:
+    """Run update_markdown_content on a chunk of files, in a worker process.
+    
+    Args:
+        file_paths: Files to update; None entries are skipped
+        dry_run: Don't write anything
+        time_budget: CPU seconds allowed per file, 0 for no limit
+        properties_paths: properties_path of files that take their
+            properties from another path
+    
+    Returns:
+        (results, removed_url_tags, quarantined): Whether each file was updated
+        (None for skipped files, errors and files over the time budget), the
+        URL tag removals counted while processing the chunk, and the files
+        that went over the time budget
+    """
+    results = []
+    quarantined = []
+    batch_count = 0
+    
+    for file_path in file_paths:
+        if file_path is None:
+            results.append(None)
+            continue
+        
+        try:
+            results.append(update_markdown_content(
+                file_path, dry_run, worker_throttle, time_budget, (properties_paths or {}).get(file_path)
+            ))
+        except FileTimeBudgetExceeded:
+            quarantined.append(file_path)
+            results.append(None)
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            results.append(None)
+        
+        if worker_throttle is not None:
+            batch_count += 1
+            if batch_count >= worker_throttle.batch_size:
+                worker_throttle.end_batch()
+                batch_count = 0
+    
+    removed = {rule: dict(tags) for rule, tags in url_tag_rules.removed.items()}
+    url_tag_rules.removed.clear()
+    return results, removed, quarantined
+
+
+def check_main(argv: List[str]) -> int:
+    """Run the read-only compliance check and return the process exit code."""
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    
+    parser = argparse.ArgumentParser(
+        prog="obsidian_properties.py check",
+        description="Report notes that are missing properties, have legacy or misordered "
+                    "properties, or still have tags in the body. Never modifies files.",
+        epilog="Exits with status 1 if any note is non-compliant, 2 on usage errors."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="Vault directories and/or individual markdown files to check"
+    )
+    parser.add_argument(
+        "--exclude-folders",
+        nargs="*",
+        default=[],
+        help="Folder names to exclude from checking"
+    )
+    parser.add_argument(
+        "--exclude-files",
+        nargs="*",
+        default=[],
+        help="Specific file names to exclude from checking"
+    )
+    parser.add_argument(
+        "--url-tag-rules",
+        type=str,
+        help="JSON file with rules for URL-generated tags"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--file-time-budget",
+        type=float,
+        default=DEFAULT_FILE_TIME_BUDGET,
+        metavar="SECONDS",
+        help=f"CPU time allowed per file before it is reported as quarantined "
+             f"(default: {DEFAULT_FILE_TIME_BUDGET:g}, 0 for no limit)"
+    )
+    args = parser.parse_args(argv)
+    
+    try:
+        init_worker(args.url_tag_rules)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not load URL tag rules from '{args.url_tag_rules}': {e}")
+        return 2
+    
+    markdown_files = []
+    for path in map(Path, args.paths):
+        if path.is_dir():
+            markdown_files.extend(find_markdown_files(path, args.exclude_folders, args.exclude_files))
+        elif path.suffix == '.md' and path.exists():
+            if not should_exclude_path(path, args.exclude_folders, args.exclude_files):
+                markdown_files.append(path)
+        elif not path.exists():
+            print(f"Error: '{path}' does not exist")
+            return 2
+    
+    # Small runs (e.g. a pre-commit hook on a few files) aren't worth starting processes for
+    check_file = partial(check_markdown_file, time_budget=args.file_time_budget)
+    if args.jobs <= 1 or len(markdown_files) < 64:
+        results = map(check_file, markdown_files)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=args.jobs,
+            initializer=init_worker,
+            initargs=(args.url_tag_rules,)
+        )
+        chunksize = max(1, min(256, len(markdown_files) // (args.jobs * 8)))
+        results = executor.map(check_file, markdown_files, chunksize=chunksize)
+    
+    failed_count = 0
+    try:
+        for file_path, problems in zip(markdown_files, results):
+            if problems:
+                failed_count += 1
+                print(f"{file_path}: {'; '.join(problems)}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    print(f"\nChecked {len(markdown_files)} files, {failed_count} non-compliant")
+    return 1 if failed_count else 0
+
+
+def main(argv: Optional[List[str]] = None):
+    import os
+    import sys
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == 'check':
+        return check_main(argv[1:])
+    
     parser = argparse.ArgumentParser(
         description="Add Obsidian properties to markdown files that don't have them",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -784,13 +2344,45 @@ Examples:
   
   # Dry run to see what would be changed
   python obsidian_properties.py /path/to/vault --dry-run
+  
+  # Low-impact maintenance run alongside other users of the disk
+  python obsidian_properties.py /path/to/vault --background --max-iops 200 --max-mbps 5
+  
+  # Check compliance without changing anything (exit status 1 on violations)
+  python obsidian_properties.py check /path/to/vault
+  
+  # Process many vaults in one run with a shared worker pool and cache
+  python obsidian_properties.py --vault-list vaults.txt --cache ~/.cache/obsidian_properties.db
         """
     )
     
     parser.add_argument(
-        "directory",
+        "directories",
+        nargs="*",
+        metavar="directory",
+        help="Vault directories containing markdown files to process"
+    )
+    
+    parser.add_argument(
+        "--vault-list",
         type=str,
-        help="Directory containing markdown files to process"
+        help="File listing vaults to process, one path per line, or a JSON list of "
+             '{"path": ..., "exclude_folders": [...], "exclude_files": [...]} objects'
+    )
+    
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Number of worker processes shared by all vaults "
+             "(default: number of CPUs, or 1 with --background)"
+    )
+    
+    parser.add_argument(
+        "--cache",
+        type=str,
+        help="Cache file remembering compliant notes, shared by all vaults, "
+             "so unchanged notes are skipped on later runs"
     )
     
     parser.add_argument(
@@ -819,86 +2411,279 @@ Examples:
         help="Show detailed output"
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        "--duplicates",
+        choices=["keep", "skip", "merge", "link"],
+        default="keep",
+        help="What to do when a file being moved is identical to one at its destination: "
+             "keep (move it as name_N.md, the default), skip (leave it in place), "
+             "merge (delete it) or link (hard link it to the existing copy)"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint journal"
+    )
     
-    # Validate directory
-    directory = Path(args.directory)
-    if not directory.exists():
-        print(f"Error: Directory '{directory}' does not exist")
-        return 1
+    parser.add_argument(
+        "--journal",
+        type=str,
+        help="Checkpoint journal file (default: .obsidian_properties.journal in the vault)"
+    )
+    
+    parser.add_argument(
+        "--url-tag-rules",
+        type=str,
+        help="JSON file with prefixes, suffixes, hex/number lengths and regexes for URL-generated tags"
+    )
+    
+    parser.add_argument(
+        "--report-url-tags",
+        action="store_true",
+        help="Report which rule removed which URL-generated tags, with counts"
+    )
+    
+    parser.add_argument(
+        "--background",
+        action="store_true",
+        help="Run with idle I/O priority and lowest CPU priority, pausing between batches"
+    )
+    
+    parser.add_argument(
+        "--max-iops",
+        type=float,
+        default=0,
+        help="Limit file reads, writes and moves to this many operations per second"
+    )
     
-    if not directory.is_dir():
-        print(f"Error: '{directory}' is not a directory")
+    parser.add_argument(
+        "--max-mbps",
+        type=float,
+        default=0,
+        help="Limit file reads and writes to this many megabytes per second"
+    )
+    
+    parser.add_argument(
+        "--file-time-budget",
+        type=float,
+        default=DEFAULT_FILE_TIME_BUDGET,
+        metavar="SECONDS",
+        help=f"CPU time allowed for transforming one file; slower files are left unchanged "
+             f"and reported as quarantined (default: {DEFAULT_FILE_TIME_BUDGET:g}, 0 for no limit)"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    # Collect vaults from the command line and the vault list
+    vaults = [{'path': Path(d), 'exclude_folders': [], 'exclude_files': []} for d in args.directories]
+    if args.vault_list:
+        try:
+            vaults.extend(load_vault_list(Path(args.vault_list)))
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read vault list '{args.vault_list}': {e}")
+            return 1
+    
+    if not vaults:
+        parser.error("give at least one vault directory or --vault-list")
+    if args.journal and len(vaults) > 1:
+        print("Error: --journal can only be used with a single vault")
         return 1
     
-    # Find all markdown files
-    print(f"Scanning for markdown files in: {directory}")
-    if args.exclude_folders:
-        print(f"Excluding folders: {', '.join(args.exclude_folders)}")
-    if args.exclude_files:
-        print(f"Excluding files: {', '.join(args.exclude_files)}")
+    # Validate directories
+    for vault in vaults:
+        directory = vault['path']
+        if not directory.exists():
+            print(f"Error: Directory '{directory}' does not exist")
+            return 1
+        
+        if not directory.is_dir():
+            print(f"Error: '{directory}' is not a directory")
+            return 1
     
-    markdown_files = find_markdown_files(directory, args.exclude_folders, args.exclude_files)
+    # Load URL tag rules
+    global url_tag_rules
+    if args.url_tag_rules:
+        try:
+            url_tag_rules = UrlTagRules.from_file(Path(args.url_tag_rules))
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not load URL tag rules from '{args.url_tag_rules}': {e}")
+            return 1
+    
+    # Set up resource limits before the vaults are scanned. They are shared
+    # between the worker processes and, when there are workers, this
+    # process, which does the moves
+    jobs = max(1, args.jobs if args.jobs else (1 if args.background else os.cpu_count() or 1))
+    limiters = jobs + 1 if jobs > 1 else 1
+    throttle_settings = None
+    if args.background:
+        applied = enter_background_mode()
+        print(f"Background mode: {', '.join(applied) if applied else 'priorities unchanged'}")
+    if args.background or args.max_iops or args.max_mbps:
+        throttle_settings = {
+            'max_iops': args.max_iops / limiters,
+            'max_mbps': args.max_mbps / limiters,
+            'batch_size': 32 if args.background else 256,
+            'batch_pause': 0.05 if args.background else 0.0,
+        }
+    
+    # Scanning and planning happen before any worker starts, so they get the whole limit
+    scan_throttle = None
+    if throttle_settings is not None:
+        scan_throttle = IOThrottle(**dict(throttle_settings, max_iops=args.max_iops, max_mbps=args.max_mbps))
+    
+    runs = []
+    for vault in vaults:
+        run = prepare_vault(
+            vault['path'],
+            args.exclude_folders + vault['exclude_folders'],
+            args.exclude_files + vault['exclude_files'],
+            args, scan_throttle
+        )
+        if run is not None:
+            runs.append(run)
     
-    if not markdown_files:
+    if not runs:
         print("No markdown files found to process")
         return 0
     
-    print(f"Found {len(markdown_files)} markdown files")
-    
     if args.dry_run:
         print("\n--- DRY RUN MODE ---")
     
-    # Process files
-    processed_count = 0
-    moved_count = 0
-    skipped_count = 0
+    cache = None
+    if args.cache:
+        cache = ComplianceCache(Path(args.cache), url_tag_rules.fingerprint())
+    
+    # Content updates run in the worker pool; moves, duplicates and journaling
+    # stay in this process and happen in plan order for each vault
+    executor = None
+    if jobs > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_worker,
+            initargs=(args.url_tag_rules, throttle_settings)
+        )
+        move_throttle = IOThrottle(**throttle_settings) if throttle_settings else None
+    else:
+        init_worker(None, throttle_settings)
+        move_throttle = worker_throttle
+    
+    total_files = sum(len(run['files']) for run in runs)
+    chunk_size = max(1, min(256, total_files // (jobs * 16)))
+    pending = deque()
+    
+    def finish_chunk(run: dict, start: int, paths: list, results: list, quarantined: list) -> None:
+        for index, file_path, updated in zip(range(start, start + len(paths)), paths, results):
+            if index in run['completed']:
+                continue
+            file_path = run['files'][index]
+            
+            if file_path in quarantined:
+                # Leave the file untouched, and don't retry it on --resume
+                run['quarantined'].append(file_path)
+                print(f"QUARANTINED (over {args.file_time_budget:g}s time budget): {file_path}")
+                if run['journal'] is not None:
+                    run['journal'].record(index, False, False)
+                continue
+            
+            if paths[index - start] is not None and updated is None:
+                # The worker already reported the error
+                properties_added, file_moved = False, False
+            else:
+                properties_added, file_moved = process_markdown_file(
+                    file_path, dry_run=args.dry_run, throttle=move_throttle,
+                    move_target=run['moves'].get(file_path),
+                    duplicate_of=run['duplicate_of'].get(file_path), duplicates=run['policy'],
+                    duplicate_report=run['duplicate_report'], updated=bool(updated),
+                    properties_path=run['properties_from'].get(file_path)
+                )
+                if (cache is not None and not properties_added and not args.dry_run
+                        and file_path not in run['duplicate_of']):
+                    final_path = run['moves'].get(file_path, file_path) if file_moved else file_path
+                    if final_path.exists():
+                        cache.mark_compliant(final_path)
+            
+            if run['journal'] is not None:
+                run['journal'].record(index, properties_added, file_moved)
+            report_file_result(run, file_path, properties_added, file_moved, args)
     
-    for file_path in markdown_files:
-        properties_added, file_moved = process_markdown_file(file_path, dry_run=args.dry_run)
+    try:
+        for run, start, end in schedule_chunks(runs, chunk_size):
+            # Only send files whose content may need work to the pool
+            paths = []
+            for index in range(start, end):
+                file_path = run['files'][index]
+                needs_content = (
+                    index not in run['completed']
+                    and (file_path not in run['duplicate_of'] or run['policy'] == 'skip')
+                    and not (cache is not None and cache.is_compliant(file_path))
+                    and file_path.exists()
+                )
+                paths.append(file_path if needs_content else None)
+            properties_paths = {
+                path: run['properties_from'][path] for path in paths if path in run['properties_from']
+            }
+            
+            if executor is not None:
+                pending.append((run, start, paths, executor.submit(
+                    update_files_chunk, paths, args.dry_run, args.file_time_budget, properties_paths
+                )))
+                if len(pending) < jobs * 4:
+                    continue
+                run, start, paths, future = pending.popleft()
+                results, removed, quarantined = future.result()
+            else:
+                results, removed, quarantined = update_files_chunk(
+                    paths, args.dry_run, args.file_time_budget, properties_paths
+                )
+            
+            url_tag_rules.merge_removed(removed)
+            finish_chunk(run, start, paths, results, quarantined)
         
-        if properties_added:
-            processed_count += 1
-            status = "WOULD ADD" if args.dry_run else "ADDED"
-            if args.verbose or args.dry_run:
-                print(f"{status} properties to: {file_path}")
+        while pending:
+            run, start, paths, future = pending.popleft()
+            results, removed, quarantined = future.result()
+            url_tag_rules.merge_removed(removed)
+            finish_chunk(run, start, paths, results, quarantined)
         
-        if file_moved:
-            moved_count += 1
-            move_status = "WOULD MOVE" if args.dry_run else "MOVED"
+        for run in runs:
+            run['completed_run'] = True
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        for run in runs:
+            if run['journal'] is not None:
+                run['journal'].close(completed=run['completed_run'])
+        if cache is not None:
+            cache.close()
+    
+    # Clean up empty directories if any files were moved, then summarize each vault
+    for run in runs:
+        run['removed_dirs_count'] = 0
+        if run['moves'] or run['duplicate_of']:
             if args.verbose or args.dry_run:
-                should_move, new_path = should_move_file(file_path)
-                print(f"{move_status}: {file_path} → {new_path}")
-        
-        if not properties_added and not file_moved:
-            skipped_count += 1
-            if args.verbose:
-                print(f"SKIPPED (already has properties): {file_path}")
+                print(f"\nCleaning up empty directories in {run['directory']}...")
+            run['removed_dirs_count'] = remove_empty_directories(run['directory'], dry_run=args.dry_run)
     
-    # Clean up empty directories if any files were moved
-    removed_dirs_count = 0
-    if moved_count > 0:
-        if args.verbose or args.dry_run:
-            print("\nCleaning up empty directories...")
-        removed_dirs_count = remove_empty_directories(directory, dry_run=args.dry_run)
+    for run in runs:
+        print_run_summary(run, args, title=f"Summary for {run['directory']}:" if len(runs) > 1 else "Summary:")
     
-    # Summary
-    print("\nSummary:")
-    if args.dry_run:
-        print(f"  Would add properties to: {processed_count} files")
-        print(f"  Would move files: {moved_count} files")
-        if removed_dirs_count > 0:
-            print(f"  Would remove empty directories: {removed_dirs_count}")
-    else:
-        print(f"  Added properties to: {processed_count} files")
-        print(f"  Moved files: {moved_count} files")
-        if removed_dirs_count > 0:
-            print(f"  Removed empty directories: {removed_dirs_count}")
-    print(f"  Skipped (no changes needed): {skipped_count} files")
-    print(f"  Total files processed: {len(markdown_files)}")
+    if len(runs) > 1:
+        print(f"\nTotal across {len(runs)} vaults:")
+        print(f"  {'Would add' if args.dry_run else 'Added'} properties to: "
+              f"{sum(run['processed_count'] for run in runs)} files")
+        print(f"  {'Would move' if args.dry_run else 'Moved'} files: {sum(run['moved_count'] for run in runs)} files")
+        print(f"  Total files processed: {total_files}")
+    
+    if move_throttle is not None and move_throttle.latency_spikes:
+        print(f"  Backed off after I/O latency spikes: {move_throttle.latency_spikes} times")
+    
+    if args.report_url_tags:
+        print("\nURL-generated tags removed:")
+        print("\n".join(url_tag_rules.report()) or "  none")
     
     return 0
 
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    exit(main())
@@ -0,0 +1,1409 @@
+#!/usr/bin/env python3
+"""
+PDF Metadata
+
+Sets the Title, Author, Subject and Keywords of PDF sheet music from file
+names of the form "Author - Title.pdf", for import into forScore.
+
+Does the same job as pdf_metadata.sh, but parses the names in-process and
+writes the metadata itself as a small incremental update appended to each
+PDF. PDFs it can't update that way are handed to a few long-running
+exiftool processes instead of launching several processes per file.
+
+"pdf_metadata.py catalog" lists the metadata and page count of a whole
+library as CSV or NDJSON, reading only a few objects from each PDF.
+"""
+
+import argparse
+import subprocess
+import threading
+from collections import namedtuple
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+
+def parse_filename(file_name: str) -> Optional[Tuple[str, str]]:
+    """Split a file name of the form "Author - Title.pdf".
+    
+    Args:
+        file_name: Name of the PDF file, without directories
+    
+    Returns:
+        (author, title), or None if the name doesn't follow the convention
+    """
+    stem = file_name[:-4] if file_name.lower().endswith('.pdf') else file_name
+    author, separator, title = stem.partition(' - ')
+    author, title = author.strip(), title.strip()
+    if not separator or not author or not title:
+        return None
+    return author, title
+
+
+class PdfError(Exception):
+    """Raised when a PDF can't be read or updated natively."""
+
+
+class UnsupportedPdf(PdfError):
+    """Raised for PDFs using features the native reader doesn't handle."""
+
+
+class TruncatedData(PdfError):
+    """Raised when an object runs past the end of the bytes read so far."""
+
+
+class PdfName(str):
+    """A PDF name such as /Title, stored without the slash."""
+
+
+# An indirect reference such as "12 0 R"
+PdfRef = namedtuple('PdfRef', 'number generation')
+
+PDF_WHITESPACE = b'\x00\t\n\x0c\r '
+PDF_DELIMITERS = b'()<>[]{}/%'
+
+# Characters of PDFDocEncoding that differ from Latin-1
+PDF_DOC_ENCODING = {
+    0x18: '\u02d8', 0x19: '\u02c7', 0x1a: '\u02c6', 0x1b: '\u02d9',
+    0x1c: '\u02dd', 0x1d: '\u02db', 0x1e: '\u02da', 0x1f: '\u02dc',
+    0x80: '\u2022', 0x81: '\u2020', 0x82: '\u2021', 0x83: '\u2026',
+    0x84: '\u2014', 0x85: '\u2013', 0x86: '\u0192', 0x87: '\u2044',
+    0x88: '\u2039', 0x89: '\u203a', 0x8a: '\u2212', 0x8b: '\u2030',
+    0x8c: '\u201e', 0x8d: '\u201c', 0x8e: '\u201d', 0x8f: '\u2018',
+    0x90: '\u2019', 0x91: '\u201a', 0x92: '\u2122', 0x93: '\ufb01',
+    0x94: '\ufb02', 0x95: '\u0141', 0x96: '\u0152', 0x97: '\u0160',
+    0x98: '\u0178', 0x99: '\u017d', 0x9a: '\u0131', 0x9b: '\u0142',
+    0x9c: '\u0153', 0x9d: '\u0161', 0x9e: '\u017e', 0xa0: '\u20ac',
+}
+
+# Info entries this script reads and writes
+INFO_KEYS = ['Title', 'Author', 'Subject', 'Keywords']
+
+# What reading a malformed PDF natively can raise. The reader checks what it
+# relies on and raises PdfError, but a file that slips past those checks must
+# still only fail on its own instead of ending the run for the whole library.
+PDF_READ_ERRORS = (PdfError, ValueError, TypeError, KeyError, IndexError, RecursionError)
+
+
+class PdfLexer:
+    """Parses PDF objects (dictionaries, arrays, strings, names, numbers, references) from bytes.
+    
+    Strings are returned as bytes, names as PdfName and references as
+    PdfRef. Raises TruncatedData when an object continues past the end of
+    the data, so the caller can read more and try again. With complete set,
+    the data is known to end there, so a number at the very end is just a
+    number rather than possibly the start of a reference.
+    """
+    
+    def __init__(self, data: bytes, pos: int = 0, complete: bool = False):
+        self.data = data
+        self.pos = pos
+        self.complete = complete
+    
+    def skip_whitespace(self) -> None:
+        """Skip whitespace and comments."""
+        data = self.data
+        while self.pos < len(data):
+            if data[self.pos] in PDF_WHITESPACE:
+                self.pos += 1
+            elif data[self.pos] == 0x25:  # '%' starts a comment running to the end of the line
+                while self.pos < len(data) and data[self.pos] not in b'\r\n':
+                    self.pos += 1
+            else:
+                break
+    
+    def next_token(self) -> bytes:
+        """Read a keyword or number."""
+        self.skip_whitespace()
+        start = self.pos
+        data = self.data
+        while self.pos < len(data) and data[self.pos] not in PDF_WHITESPACE and data[self.pos] not in PDF_DELIMITERS:
+            self.pos += 1
+        if self.pos == len(data) and not self.complete:
+            raise TruncatedData("unexpected end of data")
+        if self.pos == start:
+            raise PdfError(f"unexpected {data[start:start + 1]!r} at offset {start}")
+        return data[start:self.pos]
+    
+    def parse_object(self):
+        """Read the next object."""
+        self.skip_whitespace()
+        data = self.data
+        if self.pos >= len(data):
+            raise TruncatedData("unexpected end of data")
+        
+        if data.startswith(b'<<', self.pos):
+            return self.parse_dictionary()
+        char = data[self.pos:self.pos + 1]
+        if char == b'<':
+            return self.parse_hex_string()
+        if char == b'(':
+            return self.parse_literal_string()
+        if char == b'/':
+            return self.parse_name()
+        if char == b'[':
+            self.pos += 1
+            items = []
+            while True:
+                self.skip_whitespace()
+                if self.pos >= len(data):
+                    raise TruncatedData("unterminated array")
+                if data[self.pos:self.pos + 1] == b']':
+                    self.pos += 1
+                    return items
+                items.append(self.parse_object())
+        
+        token = self.next_token()
+        if token == b'true':
+            return True
+        if token == b'false':
+            return False
+        if token == b'null':
+            return None
+        try:
+            number = int(token)
+        except ValueError:
+            try:
+                return float(token)
+            except ValueError:
+                raise PdfError(f"unexpected {token!r} at offset {self.pos - len(token)}") from None
+        
+        # "12 0 R" is a reference, anything else leaves the number on its own
+        after_number = self.pos
+        try:
+            generation = self.next_token()
+            if generation.isdigit() and self.next_token() == b'R':
+                return PdfRef(number, int(generation))
+        except PdfError as e:
+            if isinstance(e, TruncatedData) and not self.complete:
+                raise
+        self.pos = after_number
+        return number
+    
+    def parse_dictionary(self) -> dict:
+        """Read a << ... >> dictionary, keyed by name without the slash."""
+        data = self.data
+        self.pos += 2
+        dictionary = {}
+        while True:
+            self.skip_whitespace()
+            if self.pos >= len(data):
+                raise TruncatedData("unterminated dictionary")
+            if data.startswith(b'>>', self.pos):
+                self.pos += 2
+                return dictionary
+            if data[self.pos:self.pos + 1] != b'/':
+                raise PdfError(f"expected a name at offset {self.pos}")
+            key = self.parse_name()
+            dictionary[key] = self.parse_object()
+    
+    def parse_name(self) -> PdfName:
+        """Read a /Name, decoding #xx escapes."""
+        data = self.data
+        self.pos += 1
+        start = self.pos
+        while self.pos < len(data) and data[self.pos] not in PDF_WHITESPACE and data[self.pos] not in PDF_DELIMITERS:
+            self.pos += 1
+        if self.pos == len(data) and not self.complete:
+            raise TruncatedData("unexpected end of data")
+        raw = data[start:self.pos]
+        if b'#' in raw:
+            parts = raw.split(b'#')
+            raw = parts[0] + b''.join(bytes.fromhex(part[:2].decode('ascii')) + part[2:] for part in parts[1:])
+        return PdfName(raw.decode('latin-1'))
+    
+    def parse_hex_string(self) -> bytes:
+        """Read a <hex> string."""
+        end = self.data.find(b'>', self.pos)
+        if end == -1:
+            raise TruncatedData("unterminated hex string")
+        digits = bytes(c for c in self.data[self.pos + 1:end] if c not in PDF_WHITESPACE)
+        self.pos = end + 1
+        if len(digits) % 2:
+            digits += b'0'
+        try:
+            return bytes.fromhex(digits.decode('ascii'))
+        except ValueError:
+            raise PdfError("invalid hex string") from None
+    
+    def parse_literal_string(self) -> bytes:
+        """Read a (literal) string, handling escapes and balanced parentheses."""
+        data = self.data
+        escapes = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b', ord('f'): b'\f'}
+        result = bytearray()
+        depth = 1
+        pos = self.pos + 1
+        while True:
+            if pos >= len(data):
+                raise TruncatedData("unterminated string")
+            char = data[pos]
+            if char == 0x5c:  # backslash
+                pos += 1
+                if pos >= len(data):
+                    raise TruncatedData("unterminated string")
+                escaped = data[pos]
+                if escaped in escapes:
+                    result += escapes[escaped]
+                    pos += 1
+                elif escaped in b'01234567':
+                    end = pos
+                    while end < pos + 3 and end < len(data) and data[end] in b'01234567':
+                        end += 1
+                    result.append(int(data[pos:end], 8) & 0xff)
+                    pos = end
+                elif escaped == 0x0d:
+                    # A backslash at the end of a line continues the string
+                    pos += 2 if data[pos + 1:pos + 2] == b'\n' else 1
+                elif escaped == 0x0a:
+                    pos += 1
+                else:
+                    result.append(escaped)
+                    pos += 1
+                continue
+            if char == 0x28:  # '('
+                depth += 1
+            elif char == 0x29:  # ')'
+                depth -= 1
+                if depth == 0:
+                    self.pos = pos + 1
+                    return bytes(result)
+            elif char == 0x0d:
+                # Unescaped end-of-line markers all read as \n
+                result += b'\n'
+                pos += 2 if data[pos + 1:pos + 2] == b'\n' else 1
+                continue
+            result.append(char)
+            pos += 1
+
+
+def decode_pdf_text(value) -> Optional[str]:
+    """Decode a PDF text string (UTF-16 or UTF-8 with a byte order mark, or PDFDocEncoding)."""
+    if not isinstance(value, bytes):
+        return None
+    if value.startswith(b'\xfe\xff'):
+        return value[2:].decode('utf-16-be', errors='replace')
+    if value.startswith(b'\xef\xbb\xbf'):
+        return value[3:].decode('utf-8', errors='replace')
+    return ''.join(PDF_DOC_ENCODING.get(byte, chr(byte)) for byte in value)
+
+
+def encode_pdf_text(text: str) -> bytes:
+    """Encode text for a PDF string: plain ASCII if possible, otherwise UTF-16 with a byte order mark."""
+    if text.isascii():
+        return text.encode('ascii')
+    return b'\xfe\xff' + text.encode('utf-16-be')
+
+
+def undo_png_predictor(data: bytes, row_length: int, bytes_per_pixel: int) -> bytes:
+    """Reverse the PNG row filters a FlateDecode stream was compressed with.
+    
+    Each row starts with a filter type byte: 0 none, 1 Sub, 2 Up,
+    3 Average, 4 Paeth, all relative to the pixel to the left and/or the
+    row above.
+    """
+    result = bytearray()
+    previous = bytearray(row_length)
+    for start in range(0, len(data) - row_length, row_length + 1):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + 1 + row_length])
+        if kind == 1:
+            for i in range(bytes_per_pixel, row_length):
+                row[i] = (row[i] + row[i - bytes_per_pixel]) & 0xff
+        elif kind == 2:
+            row = bytearray((a + b) & 0xff for a, b in zip(row, previous))
+        elif kind == 3:
+            for i in range(row_length):
+                left = row[i - bytes_per_pixel] if i >= bytes_per_pixel else 0
+                row[i] = (row[i] + (left + previous[i]) // 2) & 0xff
+        elif kind == 4:
+            for i in range(row_length):
+                left = row[i - bytes_per_pixel] if i >= bytes_per_pixel else 0
+                upper_left = previous[i - bytes_per_pixel] if i >= bytes_per_pixel else 0
+                estimate = left + previous[i] - upper_left
+                distances = abs(estimate - left), abs(estimate - previous[i]), abs(estimate - upper_left)
+                if distances[0] <= distances[1] and distances[0] <= distances[2]:
+                    row[i] = (row[i] + left) & 0xff
+                elif distances[1] <= distances[2]:
+                    row[i] = (row[i] + previous[i]) & 0xff
+                else:
+                    row[i] = (row[i] + upper_left) & 0xff
+        elif kind != 0:
+            raise PdfError(f"invalid PNG predictor row type {kind}")
+        result += row
+        previous = row
+    return bytes(result)
+
+
+def decode_stream(dictionary: dict, data: bytes) -> bytes:
+    """Decode the data of a stream, which must be uncompressed or FlateDecode.
+    
+    Raises:
+        UnsupportedPdf: For other filters, which object and
+            cross-reference streams don't use in practice
+    """
+    import zlib
+    
+    filters = dictionary.get('Filter')
+    parameters = dictionary.get('DecodeParms')
+    if not isinstance(filters, list):
+        filters = [] if filters is None else [filters]
+    if not isinstance(parameters, list):
+        parameters = [parameters] * len(filters)
+    
+    for name, parameter in zip(filters, parameters):
+        if name != 'FlateDecode':
+            raise UnsupportedPdf(f"stream filter /{name}")
+        try:
+            # Some writers leave junk after the compressed data, which decompressobj ignores
+            data = zlib.decompressobj().decompress(data)
+        except zlib.error as e:
+            raise PdfError(f"invalid compressed stream: {e}") from None
+        
+        parameter = parameter if isinstance(parameter, dict) else {}
+        for key in ('Predictor', 'Colors', 'BitsPerComponent', 'Columns'):
+            value = parameter.get(key, 1)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise PdfError(f"invalid /{key} {value!r} in stream parameters")
+        predictor = parameter.get('Predictor', 1)
+        if predictor >= 10:
+            bits = parameter.get('Colors', 1) * parameter.get('BitsPerComponent', 8)
+            row_length = (parameter.get('Columns', 1) * bits + 7) // 8
+            data = undo_png_predictor(data, row_length, max(1, bits // 8))
+        elif predictor != 1:
+            raise UnsupportedPdf(f"stream predictor {predictor}")
+    return data
+
+
+def serialize_pdf_object(value) -> bytes:
+    """Write a parsed object back out in PDF syntax."""
+    if isinstance(value, PdfName):
+        regular = bytes(range(0x21, 0x7f)).translate(None, PDF_DELIMITERS + b'#')
+        return b'/' + b''.join(bytes([c]) if c in regular else b'#%02X' % c for c in value.encode('latin-1'))
+    if isinstance(value, bool):
+        return b'true' if value else b'false'
+    if value is None:
+        return b'null'
+    if isinstance(value, PdfRef):
+        return b'%d %d R' % value
+    if isinstance(value, int):
+        return b'%d' % value
+    if isinstance(value, float):
+        return (b'%.6f' % value).rstrip(b'0').rstrip(b'.')
+    if isinstance(value, bytes):
+        if all(0x20 <= c < 0x7f for c in value):
+            return b'(' + value.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+        return b'<' + value.hex().upper().encode('ascii') + b'>'
+    if isinstance(value, list):
+        return b'[' + b' '.join(serialize_pdf_object(item) for item in value) + b']'
+    if isinstance(value, dict):
+        return b'<<' + b''.join(
+            serialize_pdf_object(PdfName(key)) + b' ' + serialize_pdf_object(item) for key, item in value.items()
+        ) + b'>>'
+    raise PdfError(f"can't write {type(value).__name__} to a PDF")
+
+
+class PdfFile:
+    """Reads the trailer and individual objects of a PDF through targeted seeks.
+    
+    Only the end of the file, the cross-reference sections and the objects
+    asked for are read; page contents are never touched. Both classic
+    cross-reference tables and the cross-reference streams of PDF 1.5 are
+    supported, including the chain of sections left by earlier incremental
+    updates and objects stored in compressed object streams.
+    """
+    
+    def __init__(self, f: BinaryIO, allow_encrypted: bool = False):
+        """Read the cross-reference sections and trailer.
+        
+        Args:
+            f: PDF opened in binary mode
+            allow_encrypted: Open encrypted PDFs too; their strings and
+                streams can't be read, but numbers such as the page count can
+        """
+        self.f = f
+        f.seek(0, 2)
+        self.size = f.tell()
+        self.startxref = self.find_startxref()
+        # Subsections (first object number, count, entries, field widths), newest section first.
+        # Classic tables have the file offset of their first entry and no widths; cross-reference
+        # streams have their decoded entries and the widths of the three fields.
+        self.subsections = []
+        self.trailer = {}
+        self.uses_xref_streams = False
+        # (data, offset of the first object, header) of decoded object streams, by object number
+        self.object_streams = {}
+        
+        offset = self.startxref
+        seen = set()
+        while offset is not None:
+            if offset in seen:
+                raise PdfError("cross-reference sections form a loop")
+            seen.add(offset)
+            subsections, trailer = self.read_xref_section(offset)
+            self.subsections.extend(subsections)
+            if not self.trailer:
+                self.trailer = trailer
+            offset = trailer.get('Prev')
+            if offset is not None and not isinstance(offset, int):
+                raise PdfError("invalid /Prev in trailer")
+        
+        self.encrypted = 'Encrypt' in self.trailer
+        if self.encrypted and not allow_encrypted:
+            raise UnsupportedPdf("encrypted")
+        if not isinstance(self.trailer.get('Size'), int) or not isinstance(self.trailer.get('Root'), PdfRef):
+            raise PdfError("trailer has no /Size or /Root")
+    
+    def read_at(self, offset: int, length: int) -> bytes:
+        self.f.seek(offset)
+        return self.f.read(length)
+    
+    def parse_at(self, offset: int, parse, window: int = 4096):
+        """Parse at offset with a PdfLexer, reading more of the file while objects run past the window.
+        
+        Args:
+            offset: Position in the file to start at
+            parse: Function taking the lexer and returning the parsed value
+            window: Number of bytes to read at first
+        
+        Returns:
+            (value, end): The parsed value and the file offset just after it
+        """
+        while True:
+            data = self.read_at(offset, window)
+            lexer = PdfLexer(data, complete=offset + len(data) >= self.size)
+            try:
+                return parse(lexer), offset + lexer.pos
+            except TruncatedData:
+                if offset + len(data) >= self.size or window >= 1 << 24:
+                    raise
+                window *= 4
+    
+    def find_startxref(self) -> int:
+        """Read the offset of the newest cross-reference section from the end of the file."""
+        tail_start = max(0, self.size - 4096)
+        tail = self.read_at(tail_start, self.size - tail_start)
+        index = tail.rfind(b'startxref')
+        if index == -1:
+            raise PdfError("no startxref at the end of the file")
+        lexer = PdfLexer(tail + b'\n', index + len(b'startxref'))
+        try:
+            return int(lexer.next_token())
+        except ValueError:
+            raise PdfError("invalid startxref") from None
+    
+    def read_xref_section(self, offset: int):
+        """Read the subsection headers and trailer of a cross-reference table or stream.
+        
+        Returns:
+            (subsections, trailer): Entries of self.subsections for this
+            section, and the trailer dictionary (for a stream, its dictionary)
+        """
+        if offset >= self.size:
+            raise PdfError("startxref points past the end of the file")
+        head = self.read_at(offset, 32)
+        if not head.startswith(b'xref'):
+            lexer = PdfLexer(head)
+            try:
+                number, generation = lexer.next_token(), lexer.next_token()
+                is_object = number.isdigit() and generation.isdigit() and lexer.next_token() == b'obj'
+            except TruncatedData:
+                is_object = False
+            if not is_object:
+                raise PdfError("startxref doesn't point at a cross-reference table")
+            return self.read_xref_stream(offset, PdfRef(int(number), int(generation)))
+        
+        subsections = []
+        pos = offset + 4
+        while True:
+            lexer = PdfLexer(self.read_at(pos, 256) + b' ')
+            token = lexer.next_token()
+            if token == b'trailer':
+                trailer, _ = self.parse_at(pos + lexer.pos, lambda lexer: lexer.parse_object())
+                if not isinstance(trailer, dict):
+                    raise PdfError("invalid trailer")
+                if 'XRefStm' in trailer:
+                    # A hybrid file: objects missing from the table are in this stream
+                    if not isinstance(trailer['XRefStm'], int):
+                        raise PdfError("invalid /XRefStm in trailer")
+                    stream_subsections, _ = self.read_xref_section(trailer['XRefStm'])
+                    subsections.extend(stream_subsections)
+                return subsections, trailer
+            try:
+                first, count = int(token), int(lexer.next_token())
+            except ValueError:
+                raise PdfError("invalid cross-reference table") from None
+            lexer.skip_whitespace()
+            entries = pos + lexer.pos
+            subsections.append((first, count, entries, None))
+            # Entries are exactly 20 bytes each, so the next header can be found without reading them
+            pos = entries + 20 * count
+    
+    def read_xref_stream(self, offset: int, ref: PdfRef):
+        """Read a cross-reference stream, as read_xref_section does for tables."""
+        dictionary, data = self.read_stream_at(offset, ref)
+        widths = dictionary.get('W')
+        if (dictionary.get('Type') != 'XRef' or not isinstance(widths, list) or len(widths) != 3
+                or not all(isinstance(width, int) and 0 <= width <= 8 for width in widths)):
+            raise PdfError(f"object {ref.number} is not a valid cross-reference stream")
+        index = dictionary.get('Index', [0, dictionary.get('Size')])
+        if (not isinstance(index, list) or len(index) % 2
+                or not all(isinstance(n, int) and not isinstance(n, bool) and n >= 0 for n in index)):
+            raise PdfError("invalid /Index in cross-reference stream")
+        self.uses_xref_streams = True
+        
+        subsections = []
+        entry_size = sum(widths)
+        pos = 0
+        for first, count in zip(index[::2], index[1::2]):
+            if pos + entry_size * count > len(data):
+                raise PdfError("cross-reference stream is shorter than its /Index")
+            subsections.append((first, count, data[pos:pos + entry_size * count], widths))
+            pos += entry_size * count
+        return subsections, dictionary
+    
+    def read_object_at(self, offset: int, ref: PdfRef):
+        """Parse the indirect object at offset, checking that it is ref.
+        
+        Returns:
+            (value, end): The object and the file offset just after it
+        """
+        def parse(lexer):
+            if lexer.next_token() != b'%d' % ref.number or lexer.next_token() != b'%d' % ref.generation:
+                raise PdfError(f"object {ref.number} is not where the cross-reference table says")
+            if lexer.next_token() != b'obj':
+                raise PdfError(f"invalid object {ref.number}")
+            return lexer.parse_object()
+        
+        return self.parse_at(offset, parse)
+    
+    def read_stream_at(self, offset: int, ref: PdfRef):
+        """Read the stream object at offset.
+        
+        Returns:
+            (dictionary, data): The stream dictionary and the decoded data
+        """
+        dictionary, end = self.read_object_at(offset, ref)
+        lexer = PdfLexer(self.read_at(end, 64) + b' ')
+        if not isinstance(dictionary, dict) or lexer.next_token() != b'stream':
+            raise PdfError(f"object {ref.number} is not a stream")
+        # The data starts after the end of line following "stream"
+        start = end + lexer.pos
+        newline = self.read_at(start, 2)
+        start += 2 if newline == b'\r\n' else 1 if newline[:1] in (b'\r', b'\n') else 0
+        
+        # Cross-reference streams must give their length directly, other streams may not
+        length = dictionary.get('Length')
+        if isinstance(length, PdfRef) and dictionary.get('Type') != 'XRef':
+            length = self.read_object(length)
+        if not isinstance(length, int) or length < 0 or start + length > self.size:
+            raise PdfError(f"invalid /Length for stream {ref.number}")
+        return dictionary, decode_stream(dictionary, self.read_at(start, length))
+    
+    def xref_entry(self, number: int) -> Optional[Tuple[int, int, int]]:
+        """Look up an object in the newest section that lists it.
+        
+        Returns:
+            (1, offset, generation) for an object stored directly in the file,
+            (2, object stream number, index) for one in an object stream, or
+            None if the object is free or not listed
+        """
+        for first, count, entries, widths in self.subsections:
+            if not first <= number < first + count:
+                continue
+            if widths is None:
+                entry = self.read_at(entries + 20 * (number - first), 20)
+                if len(entry) < 18 or entry[17:18] not in b'nf':
+                    raise PdfError(f"invalid cross-reference entry for object {number}")
+                if entry[17:18] == b'f':
+                    return None
+                try:
+                    return 1, int(entry[:10]), int(entry[11:16])
+                except ValueError:
+                    raise PdfError(f"invalid cross-reference entry for object {number}") from None
+            
+            entry_size = sum(widths)
+            start = entry_size * (number - first)
+            fields = []
+            for width in widths:
+                fields.append(int.from_bytes(entries[start:start + width], 'big'))
+                start += width
+            # Without a type field, every entry is an object stored directly
+            kind = fields[0] if widths[0] else 1
+            if kind not in (1, 2):
+                return None
+            return kind, fields[1], fields[2]
+        return None
+    
+    def object_offset(self, number: int) -> Optional[int]:
+        """Find where an object stored directly in the file starts."""
+        entry = self.xref_entry(number)
+        return entry[1] if entry is not None and entry[0] == 1 else None
+    
+    def read_object(self, ref: PdfRef):
+        """Read an indirect object, without its stream data."""
+        entry = self.xref_entry(ref.number)
+        if entry is None:
+            return None
+        kind, location, index = entry
+        if kind == 2:
+            return self.read_compressed_object(location, index, ref.number)
+        value, _ = self.read_object_at(location, ref)
+        return value
+    
+    def read_compressed_object(self, stream_number: int, index: int, number: int):
+        """Read object number, the index-th object of an object stream."""
+        if stream_number not in self.object_streams:
+            offset = self.object_offset(stream_number)
+            if offset is None:
+                raise PdfError(f"object stream {stream_number} is missing")
+            dictionary, data = self.read_stream_at(offset, PdfRef(stream_number, 0))
+            count, first = dictionary.get('N'), dictionary.get('First')
+            if dictionary.get('Type') != 'ObjStm' or not isinstance(count, int) or not isinstance(first, int):
+                raise PdfError(f"object {stream_number} is not a valid object stream")
+            # The stream starts with N pairs of object number and offset (relative to /First)
+            lexer = PdfLexer(data[:first] + b' ')
+            try:
+                header = [int(lexer.next_token()) for _ in range(2 * count)]
+            except (ValueError, PdfError):
+                raise PdfError(f"invalid header in object stream {stream_number}") from None
+            self.object_streams[stream_number] = data, first, header
+        data, first, header = self.object_streams[stream_number]
+        
+        if 2 * index >= len(header) or header[2 * index] != number:
+            raise PdfError(f"object {number} is not where the cross-reference stream says")
+        lexer = PdfLexer(data, first + header[2 * index + 1], complete=True)
+        try:
+            return lexer.parse_object()
+        except TruncatedData:
+            raise PdfError(f"object {number} runs past the end of object stream {stream_number}") from None
+    
+    def resolve(self, value):
+        """Follow a reference to the object it points at."""
+        return self.read_object(value) if isinstance(value, PdfRef) else value
+    
+    def info_dictionary(self) -> dict:
+        """The document information dictionary, with values as stored."""
+        info = self.resolve(self.trailer.get('Info'))
+        return info if isinstance(info, dict) else {}
+    
+    def info(self) -> dict:
+        """Title, Author, Subject and Keywords as text, None where missing."""
+        info = self.info_dictionary()
+        return {key: decode_pdf_text(self.resolve(info.get(key))) for key in INFO_KEYS}
+    
+    def page_count(self) -> Optional[int]:
+        """Number of pages, from the /Count of the root of the page tree."""
+        root = self.resolve(self.trailer['Root'])
+        pages = self.resolve(root.get('Pages')) if isinstance(root, dict) else None
+        count = self.resolve(pages.get('Count')) if isinstance(pages, dict) else None
+        return count if isinstance(count, int) and not isinstance(count, bool) else None
+
+
+def has_info(file_path: Path, values: dict) -> bool:
+    """Whether the PDF's Info dictionary already holds these values.
+    
+    Raises:
+        PdfError: If the PDF can't be read natively; see PDF_READ_ERRORS
+    """
+    with open(file_path, 'rb') as f:
+        current = PdfFile(f).info()
+    return all(current.get(key) == text for key, text in values.items())
+
+
+def write_info_update(file_path: Path, values: dict) -> int:
+    """Set Info entries by appending an incremental update to the PDF.
+    
+    The rest of the file is left as it is: a new Info object, a
+    cross-reference section listing only that object and a new trailer
+    pointing back at the previous one are appended. The result is read back
+    and the file is truncated to its old length if it doesn't check out.
+    
+    Args:
+        file_path: PDF to update
+        values: Info entries to set, e.g. {'Title': ..., 'Author': ...}
+    
+    Returns:
+        Number of bytes appended, 0 if the PDF already had these values
+    
+    Raises:
+        UnsupportedPdf: For encrypted PDFs and PDFs with cross-reference streams
+        PdfError: If the PDF can't be read or the update doesn't verify; see PDF_READ_ERRORS
+    """
+    # Leave PDFs that are already tagged alone, without opening them for writing
+    if has_info(file_path, values):
+        return 0
+    
+    with open(file_path, 'r+b') as f:
+        pdf = PdfFile(f)
+        if pdf.uses_xref_streams:
+            raise UnsupportedPdf("uses a cross-reference stream")
+        
+        info = dict(pdf.info_dictionary())
+        for key, text in values.items():
+            info[PdfName(key)] = encode_pdf_text(text)
+        
+        # The new Info object takes the next free object number; the new
+        # section also lists the head of the free list, as readers expect
+        number = pdf.trailer['Size']
+        trailer = {key: value for key, value in pdf.trailer.items() if key not in ('Prev', 'XRefStm')}
+        trailer.update({'Size': number + 1, 'Info': PdfRef(number, 0), 'Prev': pdf.startxref})
+        
+        original_size = pdf.size
+        update = b'' if pdf.read_at(original_size - 1, 1) in (b'\n', b'\r') else b'\n'
+        object_offset = original_size + len(update)
+        update += b'%d 0 obj\n' % number + serialize_pdf_object(info) + b'\nendobj\n'
+        xref_offset = original_size + len(update)
+        update += (
+            b'xref\n0 1\n0000000000 65535 f\r\n%d 1\n%010d 00000 n\r\n' % (number, object_offset)
+            + b'trailer\n' + serialize_pdf_object(trailer)
+            + b'\nstartxref\n%d\n%%%%EOF\n' % xref_offset
+        )
+        
+        f.seek(original_size)
+        f.write(update)
+        f.flush()
+        
+        # Read the update back the way a PDF reader would
+        try:
+            written = PdfFile(f)
+            if written.trailer.get('Root') != pdf.trailer['Root']:
+                raise PdfError("verification failed: /Root changed")
+            written_info = written.info()
+            for key, text in values.items():
+                if written_info.get(key) != text:
+                    raise PdfError(f"verification failed: /{key} reads back as {written_info.get(key)!r}")
+        except Exception:
+            f.truncate(original_size)
+            raise
+    
+    return len(update)
+
+
+def load_genre_config(config_path: Path, library: Path) -> List[Tuple[Tuple[str, ...], dict]]:
+    """Read a JSON file mapping directories of the library to a Subject and Keywords.
+    
+    The file looks like:
+        
+        {
+            "Pop Rock": {"subject": "Pop Rock"},
+            "Classical": {"subject": "Classical", "keywords": "Classical"},
+            "Classical/Baroque": {"keywords": "Classical, Baroque"}
+        }
+    
+    Directories are relative to the library (or absolute paths inside it);
+    "." applies to the whole library.
+    
+    Returns:
+        (path parts, {'Subject': ..., 'Keywords': ...}) for each directory
+    
+    Raises:
+        ValueError: If the file isn't in this format
+    """
+    import json
+    
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError("expected an object mapping directories to settings")
+    
+    genres = []
+    for directory, settings in config.items():
+        if not isinstance(settings, dict) or not set(settings) <= {'subject', 'keywords'}:
+            raise ValueError(f"settings for '{directory}' must be an object with \"subject\" and/or \"keywords\"")
+        if any(not isinstance(value, str) or '\n' in value for value in settings.values()):
+            raise ValueError(f"subject and keywords for '{directory}' must be single-line strings")
+        path = Path(directory)
+        if path.is_absolute():
+            try:
+                path = path.relative_to(library.resolve())
+            except ValueError:
+                raise ValueError(f"'{directory}' is not inside {library}") from None
+        genres.append((path.parts, {key.capitalize(): value for key, value in settings.items()}))
+    return genres
+
+
+def genre_for(relative_path: Path, genres: List[Tuple[Tuple[str, ...], dict]]) -> dict:
+    """Subject and Keywords for a PDF from the directories in the config containing it.
+    
+    Settings of a subdirectory override those of the directories above it,
+    so "Classical/Baroque" above keeps the Subject "Classical".
+    """
+    values = {}
+    parts = relative_path.parent.parts
+    for directory, settings in sorted(genres, key=lambda genre: len(genre[0])):
+        if parts[:len(directory)] == directory:
+            values.update(settings)
+    return values
+
+
+class Manifest:
+    """Size, modification time and metadata of every PDF tagged by earlier runs.
+    
+    A PDF whose size and modification time haven't changed since it was
+    tagged with the same values is skipped without being opened.
+    """
+    
+    def __init__(self, manifest_path: Path, library: Path):
+        import json
+        
+        self.manifest_path = manifest_path
+        self.library = library
+        self.entries = {}
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable manifest {manifest_path}: {e}")
+    
+    def key(self, file_path: Path) -> str:
+        return file_path.relative_to(self.library).as_posix()
+    
+    def is_unchanged(self, file_path: Path, values: dict) -> bool:
+        """Whether the PDF was tagged with these values and hasn't changed since."""
+        entry = self.entries.get(self.key(file_path))
+        if entry is None or entry.get('values') != values:
+            return False
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        return entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+    
+    def record(self, file_path: Path, values: dict) -> None:
+        """Remember that the PDF, as it is now, is tagged with these values."""
+        stat = file_path.stat()
+        self.entries[self.key(file_path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'values': values}
+    
+    def save(self) -> None:
+        """Write the manifest, replacing the old one only once the new one is complete."""
+        import json
+        import os
+        
+        temp_path = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.manifest_path)
+
+
+class ExiftoolWorker:
+    """A long-lived `exiftool -stay_open True -@ -` process.
+    
+    Commands are written to its stdin one argument per line, each ending
+    with a numbered -execute; exiftool answers each with its output followed
+    by a matching {ready} line. Several commands can be written before their
+    answers are read, so the process never waits for us between files.
+    """
+    
+    def __init__(self, exiftool: str = 'exiftool'):
+        self.process = subprocess.Popen(
+            # File names are passed as UTF-8, which Windows builds don't assume
+            [exiftool, '-stay_open', 'True', '-@', '-', '-common_args', '-charset', 'filename=utf8'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            encoding='utf-8',
+            errors='replace',
+        )
+        self._next_id = 0
+    
+    def submit(self, args: List[str]) -> int:
+        """Send one command without waiting for it to finish.
+        
+        Args:
+            args: exiftool arguments, which must not contain newlines
+        
+        Returns:
+            Number identifying the command, to pass to read_result
+        """
+        self._next_id += 1
+        self.process.stdin.write(''.join(f"{arg}\n" for arg in args) + f"-execute{self._next_id}\n")
+        self.process.stdin.flush()
+        return self._next_id
+    
+    def read_result(self, command_id: int) -> str:
+        """Read the output of a submitted command, up to its {ready} line.
+        
+        Commands must be read in the order they were submitted.
+        """
+        ready = f"{{ready{command_id}}}"
+        lines = []
+        for line in self.process.stdout:
+            if line.rstrip('\n') == ready:
+                return ''.join(lines)
+            lines.append(line)
+        raise RuntimeError(f"exiftool exited unexpectedly: {''.join(lines).strip()}")
+    
+    def close(self) -> None:
+        """Ask exiftool to exit and wait for it."""
+        try:
+            self.process.stdin.write("-stay_open\nFalse\n")
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+
+def metadata_args(file_path: Path, title: str, author: str,
+                  subject: Optional[str] = None, keywords: Optional[str] = None) -> List[str]:
+    """Build the exiftool arguments that set the metadata of one PDF.
+    
+    The file is modified in place with -overwrite_original, so no
+    "_original" backup copy is left behind.
+    """
+    args = ['-overwrite_original', f'-Title={title}', f'-Author={author}']
+    if subject is not None:
+        args.append(f'-Subject={subject}')
+    if keywords is not None:
+        args.append(f'-Keywords={keywords}')
+    # An absolute path can't be mistaken for an option or an argument file comment
+    args.append(str(file_path.resolve()))
+    return args
+
+
+def run_worker(worker: ExiftoolWorker, jobs: list, jobs_lock: threading.Lock, results: dict,
+               batch_size: int = 50) -> None:
+    """Feed jobs from a shared list to one exiftool process until none are left.
+    
+    Up to batch_size commands are in flight at a time, so exiftool always
+    has the next file queued while we read the answer for the previous one.
+    
+    Args:
+        worker: The exiftool process this thread drives
+        jobs: (file_path, args) tuples, shared with the other threads
+        jobs_lock: Lock protecting jobs
+        results: Output of exiftool for each file, filled in by this function
+        batch_size: Maximum number of commands submitted but not yet read
+    """
+    in_flight = []
+    while True:
+        with jobs_lock:
+            batch = jobs[:batch_size - len(in_flight)]
+            del jobs[:len(batch)]
+        
+        for file_path, args in batch:
+            in_flight.append((file_path, worker.submit(args)))
+        if not in_flight:
+            return
+        
+        # Read one answer, then top the pipeline up again
+        file_path, command_id = in_flight.pop(0)
+        try:
+            results[file_path] = worker.read_result(command_id)
+        except RuntimeError as e:
+            # This process is gone; the other threads carry on with the remaining jobs
+            for failed_path, _ in [(file_path, command_id)] + in_flight:
+                results[failed_path] = str(e)
+            return
+
+
+def update_metadata(files: List[Tuple[Path, List[str]]], workers: int = 2,
+                    batch_size: int = 50, exiftool: str = 'exiftool') -> dict:
+    """Run exiftool commands for many files over a pool of exiftool processes.
+    
+    Args:
+        files: (file_path, args) for each file
+        workers: Number of exiftool processes, each driven by its own thread
+        batch_size: Maximum number of commands in flight per process
+        exiftool: exiftool executable
+    
+    Returns:
+        Dict mapping each file path to the output exiftool printed for it
+    """
+    jobs = list(files)
+    jobs_lock = threading.Lock()
+    results = {}
+    pool = [ExiftoolWorker(exiftool) for _ in range(max(1, min(workers, len(jobs))))]
+    
+    try:
+        threads = [
+            threading.Thread(target=run_worker, args=(worker, jobs, jobs_lock, results, batch_size))
+            for worker in pool
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for worker in pool:
+            worker.close()
+    
+    return results
+
+
+def command_succeeded(output: str) -> bool:
+    """Whether exiftool's output for one file reports the file as updated."""
+    return '1 image files updated' in output and 'Error' not in output
+
+
+# Columns of the catalog, in order
+CATALOG_FIELDS = ['path', 'title', 'author', 'subject', 'keywords', 'pages', 'name_ok', 'error']
+
+
+def catalog_pdf(file_path: Path, library: Path) -> dict:
+    """Read the catalog entry of one PDF: its Info entries and page count.
+    
+    Only the trailer, the Info dictionary and the root of the page tree are
+    read. Runs in worker processes, so a PDF that can't be read is reported
+    in the "error" field instead of raising. The Info entries and the page
+    count are read separately, so one failing still lists the other.
+    
+    Args:
+        file_path: PDF to read
+        library: Directory the path in the entry is relative to
+    
+    Returns:
+        Dict with a value for each of CATALOG_FIELDS
+    """
+    entry = dict.fromkeys(CATALOG_FIELDS)
+    entry['path'] = file_path.relative_to(library).as_posix()
+    entry['name_ok'] = parse_filename(file_path.name) is not None
+    errors = []
+    try:
+        with open(file_path, 'rb') as f:
+            pdf = PdfFile(f, allow_encrypted=True)
+            if pdf.encrypted:
+                errors.append("encrypted, metadata not read")
+            else:
+                try:
+                    info = pdf.info()
+                except (OSError, *PDF_READ_ERRORS) as e:
+                    errors.append(f"metadata: {str(e) or type(e).__name__}")
+                else:
+                    for key in INFO_KEYS:
+                        entry[key.lower()] = info[key]
+            try:
+                entry['pages'] = pdf.page_count()
+            except (OSError, *PDF_READ_ERRORS) as e:
+                errors.append(f"pages: {str(e) or type(e).__name__}")
+    except (OSError, *PDF_READ_ERRORS) as e:
+        errors.append(str(e) or type(e).__name__)
+    entry['error'] = "; ".join(errors) or None
+    return entry
+
+
+def catalog_main(argv: List[str]) -> int:
+    """Write the catalog of a library and return the process exit code."""
+    import csv
+    import json
+    import os
+    import sys
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    
+    parser = argparse.ArgumentParser(
+        prog="pdf_metadata.py catalog",
+        description="List the Title, Author, Subject, Keywords and page count of every PDF "
+                    "in a directory and its subfolders. Never modifies files.",
+        epilog="name_ok is false for files not named 'Author - Title.pdf'; error says why a "
+               "PDF couldn't be read."
+    )
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default=".",
+        help="Library to catalog (default: current directory)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        default="csv",
+        help="csv (the default) or ndjson, one JSON object per line"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="File to write the catalog to (default: standard output)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs)"
+    )
+    args = parser.parse_args(argv)
+    
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"Error: '{directory}' is not a directory", file=sys.stderr)
+        return 1
+    pdf_files = sorted(directory.rglob('*.pdf'))
+    
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    if args.format == 'csv':
+        writer = csv.DictWriter(output, fieldnames=CATALOG_FIELDS, lineterminator='\n')
+        writer.writeheader()
+        write_entry = writer.writerow
+    else:
+        def write_entry(entry):
+            output.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    
+    # Small libraries aren't worth starting processes for
+    read_entry = partial(catalog_pdf, library=directory)
+    if args.jobs <= 1 or len(pdf_files) < 64:
+        entries = map(read_entry, pdf_files)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+        chunksize = max(1, min(256, len(pdf_files) // (args.jobs * 8)))
+        entries = executor.map(read_entry, pdf_files, chunksize=chunksize)
+    
+    misnamed_count = 0
+    unreadable_count = 0
+    try:
+        # Entries are written as they arrive, in file order
+        for entry in entries:
+            write_entry(entry)
+            misnamed_count += not entry['name_ok']
+            unreadable_count += entry['error'] is not None
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if output is not sys.stdout:
+            output.close()
+    
+    print(f"Cataloged {len(pdf_files)} PDFs, {misnamed_count} not named 'Author - Title.pdf', "
+          f"{unreadable_count} with errors", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    import sys
+    
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == 'catalog':
+        return catalog_main(argv[1:])
+    
+    parser = argparse.ArgumentParser(
+        description="Set PDF Title and Author from 'Author - Title.pdf' file names, "
+                    "plus an optional Subject and Keywords, using exiftool",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Tag all PDFs in the current directory as "Pop Rock" (the forScore genre)
+  python pdf_metadata.py --subject "Pop Rock"
+  
+  # Classical scores with keywords, in another directory
+  python pdf_metadata.py ~/scores/classical --subject Classical --keywords Classical
+  
+  # A whole library in one run, with genres per folder from a config file
+  python pdf_metadata.py ~/scores --config genres.json
+  
+  # List the metadata and page count of every PDF in the library
+  python pdf_metadata.py catalog ~/scores --output catalog.csv
+        """
+    )
+    
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default=".",
+        help="Directory containing the PDF files (default: current directory)"
+    )
+    
+    parser.add_argument(
+        "--config",
+        type=str,
+        help="JSON file mapping folders of the library to a subject and keywords; "
+             "all subfolders are processed and inherit the settings of their parents"
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="File remembering already tagged PDFs so unchanged ones aren't opened again "
+             "(default: .pdf_metadata_manifest.json in the directory)"
+    )
+    
+    parser.add_argument(
+        "--no-manifest",
+        action="store_true",
+        help="Check every PDF, without reading or writing a manifest"
+    )
+    
+    parser.add_argument(
+        "--subject",
+        type=str,
+        help="Subject to set (the forScore genre); left unchanged if not given"
+    )
+    
+    parser.add_argument(
+        "--keywords",
+        type=str,
+        help="Keywords to set; left unchanged if not given"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Number of exiftool processes to run in parallel (default: 2)"
+    )
+    
+    parser.add_argument(
+        "--writer",
+        choices=["native", "exiftool"],
+        default="native",
+        help="native appends a small update to each PDF and uses exiftool only for PDFs it "
+             "can't handle (the default); exiftool uses exiftool for every file"
+    )
+    
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show detailed output"
+    )
+    
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be set without changing any files"
+    )
+    
+    parser.add_argument(
+        "--exiftool",
+        type=str,
+        default="exiftool",
+        help="Path to the exiftool executable"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"Error: '{directory}' is not a directory")
+        return 1
+    
+    # exiftool reads one argument per line
+    if '\n' in (args.subject or '') + (args.keywords or ''):
+        print("Error: --subject and --keywords can't contain line breaks")
+        return 1
+    
+    genres = []
+    if args.config:
+        try:
+            genres = load_genre_config(Path(args.config), directory)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read config '{args.config}': {e}")
+            return 1
+    
+    # A dry run reads the manifest to skip the same files, but never saves it
+    manifest = None
+    if not args.no_manifest:
+        manifest_path = Path(args.manifest) if args.manifest else directory / '.pdf_metadata_manifest.json'
+        manifest = Manifest(manifest_path, directory)
+    
+    # With a config, walk the whole library
+    pdf_files = sorted(directory.rglob('*.pdf') if args.config else directory.glob('*.pdf'))
+    
+    files = []
+    skipped_count = 0
+    unchanged_count = 0
+    for file_path in pdf_files:
+        name = file_path.relative_to(directory)
+        parsed = parse_filename(file_path.name)
+        if parsed is None or '\n' in str(name):
+            print(f"SKIPPED (not 'Author - Title.pdf'): {name}")
+            skipped_count += 1
+            continue
+        author, title = parsed
+        values = {'Title': title, 'Author': author}
+        if args.subject is not None:
+            values['Subject'] = args.subject
+        if args.keywords is not None:
+            values['Keywords'] = args.keywords
+        values.update(genre_for(name, genres))
+        
+        if manifest is not None and manifest.is_unchanged(file_path, values):
+            unchanged_count += 1
+            if args.verbose:
+                print(f"UNCHANGED since the last run: {name}")
+            continue
+        if args.dry_run:
+            try:
+                already_tagged = args.writer == 'native' and has_info(file_path, values)
+            except (OSError, *PDF_READ_ERRORS):
+                already_tagged = False
+            if already_tagged:
+                unchanged_count += 1
+                if args.verbose:
+                    print(f"UNCHANGED (already tagged): {name}")
+                continue
+            print(f"WOULD SET {', '.join(f'{key.lower()} {text!r}' for key, text in values.items())} for {name}")
+        files.append((file_path, values))
+    
+    if not files:
+        print(f"No PDF files to update in {directory}" + (f" ({unchanged_count} unchanged)" if unchanged_count else ""))
+        return 0
+    if args.dry_run:
+        print(f"\nWould update {len(files)} files, unchanged {unchanged_count}, skipped {skipped_count}")
+        return 0
+    
+    updated_count = 0
+    failed_count = 0
+    exiftool_files = []
+    try:
+        for file_path, values in files:
+            name = file_path.relative_to(directory)
+            if args.writer == 'exiftool':
+                exiftool_files.append((file_path, values))
+                continue
+            try:
+                appended = write_info_update(file_path, values)
+            except PDF_READ_ERRORS as e:
+                # exiftool rewrites the whole file, but copes with anything
+                if args.verbose:
+                    print(f"Using exiftool for {name}: {e}")
+                exiftool_files.append((file_path, values))
+                continue
+            except OSError as e:
+                failed_count += 1
+                print(f"FAILED {name}: {e}")
+                continue
+            
+            if appended:
+                updated_count += 1
+                print(f"Set title and author for {name}" + (f" ({appended} bytes appended)" if args.verbose else ""))
+            else:
+                unchanged_count += 1
+                if args.verbose:
+                    print(f"UNCHANGED (already tagged): {name}")
+            if manifest is not None:
+                manifest.record(file_path, values)
+        
+        if exiftool_files:
+            commands = [
+                (file_path, metadata_args(file_path, values['Title'], values['Author'],
+                                          values.get('Subject'), values.get('Keywords')))
+                for file_path, values in exiftool_files
+            ]
+            try:
+                results = update_metadata(commands, workers=args.workers, exiftool=args.exiftool)
+            except FileNotFoundError:
+                print(f"Error: '{args.exiftool}' not found, see https://exiftool.org/install.html")
+                results = {}
+            
+            for file_path, values in exiftool_files:
+                name = file_path.relative_to(directory)
+                output = results.get(file_path, '')
+                if command_succeeded(output):
+                    updated_count += 1
+                    print(f"Set title and author for {name}")
+                    if manifest is not None:
+                        manifest.record(file_path, values)
+                else:
+                    failed_count += 1
+                    print(f"FAILED {name}: {output.strip() or 'not updated by exiftool'}")
+    finally:
+        # Keep what was done so far, even if the run was interrupted
+        if manifest is not None and not args.dry_run:
+            manifest.save()
+    
+    print(f"\nUpdated {updated_count} files, already tagged {unchanged_count}, "
+          f"failed {failed_count}, skipped {skipped_count}")
+    return 1 if failed_count else 0
+
+
+if __name__ == "__main__":
+    exit(main())